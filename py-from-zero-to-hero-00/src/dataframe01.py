@@ -1,5 +1,8 @@
 import pandas as pd
 
+import order_cube
+from order_stream import OrderStats
+
 data = {
     "order_id":  [1, 1, 1, 2, 2, 3, 3, 4],
     "customer":  ["Renato", "Renato", "Renato", "Ana", "Ana", "Carlos", "Carlos", "Renato"],
@@ -79,3 +82,30 @@ print(summary)
 
 print("\nDistinct products:\t", df["product"].nunique())
 print("Product list:\t\t", list(df["product"].unique()))
+
+# ===========================================================
+print("\n=== SAME TABLES, STREAMED IN CHUNKS ===")
+
+# order_stream.py computes the same reports from chunks, merging partial aggregates,
+# so a multi-GB export never has to fit in memory: python order_stream.py orders.csv
+stream_stats = OrderStats()
+for start in range(0, len(df), 3):
+    stream_stats.add(df.iloc[start:start + 3])
+
+pd.testing.assert_frame_equal(stream_stats.customer_stats(), customer_stats)
+pd.testing.assert_frame_equal(stream_stats.product_stats(), product_stats)
+print(stream_stats.customer_stats())
+print(stream_stats.product_stats())
+
+# ===========================================================
+print("\n=== SAME TABLES, ROLLED UP FROM THE ORDER CUBE ===")
+
+# order_cube.py groups the lines once by order_id x customer x product x category and caches
+# that cube on disk; every report is then a cheap rollup of the cube instead of a new groupby
+cube = order_cube.cube_for_frame(df[["order_id", "customer", "product", "category", "quantity", "unit_price"]])
+
+pd.testing.assert_frame_equal(order_cube.customer_stats(cube), customer_stats)
+pd.testing.assert_frame_equal(order_cube.customer_category_stats(cube), customer_category_stats)
+pd.testing.assert_frame_equal(order_cube.product_stats(cube), product_stats)
+pd.testing.assert_series_equal(order_cube.summary(cube), summary, check_dtype=False)
+print(order_cube.customer_category_stats(cube))
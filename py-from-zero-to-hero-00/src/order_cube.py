@@ -0,0 +1,183 @@
+import hashlib
+import os
+import tempfile
+from importlib.util import find_spec
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# ---------------------------------------------------------
+# ORDER CUBE: ONE GROUPBY, MANY REPORTS
+# ---------------------------------------------------------
+# Instead of one groupby per report, we group the order lines once by every dimension
+# (order_id x customer x product x category) and keep additive measures per cell.
+# Any report by a subset of the dimensions is then a "rollup": a groupby over the cube,
+# which has far fewer rows than the raw data.
+#
+#   sum, count, min, max  -> roll up with sum, sum, min, max
+#   mean, std             -> each cell keeps count, mean and m2 (sum of squared distances to its mean);
+#                            cells merge like the chunks of order_stream.py (Chan et al.), which stays exact
+#                            where sum_of_squares - sum**2 / n would cancel out (big values, small spread)
+#
+# The cube is saved to disk (pickle) under a hash of the input and of the pandas/pyarrow versions, so building the same
+# reports/dashboard again over the same data skips the groupby entirely.
+
+DIMENSIONS = ["order_id", "customer", "product", "category"]
+
+# Bump when the measures change, so old cached cubes are ignored
+CUBE_VERSION = 2
+
+CACHE_DIR = Path(".order_cube_cache")
+
+# How each measure rolls up (total_mean and total_m2 are merged by rollup() itself)
+ROLLUP = {
+    "total_sum": "sum",
+    "total_count": "sum",
+    "total_min": "min",
+    "total_max": "max",
+    "unit_price_sum": "sum",
+    "unit_price_count": "sum",
+    "quantity_sum": "sum",
+    "lines": "sum",
+}
+
+def build_cube(df):
+    """Groups the order lines once by all DIMENSIONS (single vectorized pass)"""
+    total = df["quantity"] * df["unit_price"]
+    # dropna=False: a line with a missing customer/product/category still counts in the rollups by the other dimensions
+    grouped = df.assign(total=total).groupby(DIMENSIONS, dropna=False, sort=True)
+    cube = grouped.agg(
+        total_sum=("total", "sum"),
+        total_count=("total", "count"),
+        total_min=("total", "min"),
+        total_max=("total", "max"),
+        unit_price_sum=("unit_price", "sum"),
+        unit_price_count=("unit_price", "count"),
+        quantity_sum=("quantity", "sum"),
+        lines=("order_id", "size"),
+        total_mean=("total", "mean"),
+    )
+    cube["total_m2"] = grouped["total"].var(ddof=0) * cube["total_count"]
+    return cube
+
+def _merge_cells(cube, **groups):
+    """Rolls up the cells of each group (cube.groupby(**groups)): additive measures with ROLLUP,
+    count/mean/m2 with the k-way form of the Chan et al. merge in order_stream.merge_moments"""
+    grouped = cube.groupby(sort=True, **groups)
+    measures = grouped.agg(ROLLUP)
+    group_mean = grouped["total_sum"].transform("sum") / grouped["total_count"].transform("sum")
+    # m2 of a group = m2 of its cells + the spread of the cell means around the group mean
+    spread = cube["total_count"] * (cube["total_mean"] - group_mean) ** 2
+    measures["total_mean"] = measures["total_sum"] / measures["total_count"]
+    measures["total_m2"] = grouped["total_m2"].sum() + spread.groupby(sort=True, **groups).sum()
+    return measures
+
+def rollup(cube, by):
+    """Aggregates the cube cells up to the `by` dimensions (a name or a list of names)"""
+    return _merge_cells(cube, level=by)
+
+# ---------------------------------------------------------
+# CACHE: the cube is stored under a hash of its input (unreadable files are rebuilt)
+# ---------------------------------------------------------
+
+def _environment():
+    """The pickled cube depends on the pandas (and pyarrow, for arrow-backed columns) version that wrote it"""
+    versions = f"v{CUBE_VERSION}|pandas {pd.__version__}"
+    if find_spec("pyarrow") is not None:
+        import pyarrow
+        versions += f"|pyarrow {pyarrow.__version__}"
+    return versions
+
+def frame_key(df):
+    """Hash of the columns and every value of a DataFrame"""
+    digest = hashlib.sha256(f"{_environment()}|{list(df.columns)}".encode())
+    digest.update(pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes())
+    return digest.hexdigest()
+
+def file_key(path):
+    """Hash of the bytes of a file, read in 1 MB blocks"""
+    digest = hashlib.sha256(f"{_environment()}|".encode())
+    with open(path, "rb") as file:
+        while block := file.read(1 << 20):
+            digest.update(block)
+    return digest.hexdigest()
+
+def cached_cube(key, build, cache_dir=CACHE_DIR):
+    """Loads the cube saved under `key`, or builds it with build() and saves it"""
+    path = Path(cache_dir) / f"cube-{key[:32]}.pkl"
+    if path.exists():
+        try:
+            return pd.read_pickle(path)
+        except Exception:
+            # Truncated or unreadable here (e.g. written by another environment): rebuild it
+            pass
+    cube = build()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # Write to a temporary file and rename it, so a reader never sees a half-written cube
+    fd, temp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    os.close(fd)
+    try:
+        cube.to_pickle(temp_path)
+        os.replace(temp_path, path)
+    except BaseException:
+        os.remove(temp_path)
+        raise
+    return cube
+
+def cube_for_frame(df, cache_dir=CACHE_DIR):
+    return cached_cube(frame_key(df), lambda: build_cube(df), cache_dir)
+
+def cube_for_file(path, cache_dir=CACHE_DIR):
+    """Cube of a CSV/Parquet order export; an unchanged file is not even parsed again"""
+    def build():
+        is_parquet = str(path).lower().endswith((".parquet", ".pq"))
+        return build_cube(pd.read_parquet(path) if is_parquet else pd.read_csv(path))
+    return cached_cube(file_key(path), build, cache_dir)
+
+# ---------------------------------------------------------
+# REPORTS (the dataframe01.py tables) AND CHART DATA (plotly02.py)
+# ---------------------------------------------------------
+
+def _stats(measures, columns):
+    count = measures["total_count"]
+    stats = pd.DataFrame(index=measures.index)
+    stats["sum"] = measures["total_sum"]
+    stats["mean"] = measures["total_mean"]
+    stats["min"] = measures["total_min"]
+    stats["max"] = measures["total_max"]
+    stats["count"] = count.astype("int64")
+    stats["std"] = np.sqrt(measures["total_m2"] / (count - 1)).where(count > 1)
+    return stats[columns]
+
+def summary(cube):
+    totals = _merge_cells(cube, by=np.zeros(len(cube), dtype=np.int8))
+    return _stats(totals, ["sum", "mean", "min", "max", "count", "std"]).iloc[0].rename("total")
+
+def customer_stats(cube):
+    return _stats(rollup(cube, "customer"), ["sum", "mean", "min", "max", "count", "std"])
+
+def customer_category_stats(cube):
+    return _stats(rollup(cube, ["customer", "category"]), ["sum", "mean", "min", "max", "count"])
+
+def product_stats(cube):
+    measures = rollup(cube, "product")
+    # customer is a dimension, so distinct customers per product come straight from the cube's index
+    cells = cube.index.to_frame(index=False)
+    return pd.DataFrame({
+        "total_revenue": measures["total_sum"],
+        "avg_unit_price": measures["unit_price_sum"] / measures["unit_price_count"],
+        "times_sold": measures["lines"].astype("int64"),
+        "distinct_customers": cells.groupby("product")["customer"].nunique(),
+    })
+
+def sales_by(cube, dimension):
+    """Revenue per value of one dimension, biggest first: columns [dimension, "total"]"""
+    sales = rollup(cube, dimension)["total_sum"].rename("total").reset_index()
+    return sales.sort_values("total", ascending=False)
+
+def order_lines(cube):
+    """One row per cube cell with its quantity and total (order lines of the same order/product are merged)"""
+    return cube[["quantity_sum", "total_sum"]].rename(
+        columns={"quantity_sum": "quantity", "total_sum": "total"}
+    ).reset_index()
@@ -0,0 +1,210 @@
+import sys
+
+import numpy as np
+import pandas as pd
+
+# ---------------------------------------------------------
+# STREAMED ORDER ANALYTICS
+# ---------------------------------------------------------
+# dataframe01.py loads every order line into one DataFrame and runs groupby on it.
+# For exports that don't fit in memory, OrderStats reads the file chunk by chunk and keeps,
+# per group, only "partial aggregates" that can be merged with the ones of the next chunk:
+#   - sum, count, min and max merge trivially
+#   - mean and variance (for std) are merged with the parallel version of Welford's algorithm:
+#     each side keeps (count, mean, m2 = sum of squared distances to the mean)
+#   - nunique needs the distinct values themselves (exact sets), or a HyperLogLog sketch
+#     that estimates them in fixed memory
+#
+# Usage: python order_stream.py orders.csv [chunk_size] [--hll]   (or orders.parquet)
+
+ORDER_COLUMNS = ["order_id", "customer", "product", "category", "quantity", "unit_price"]
+
+def read_order_chunks(path, chunk_size=100_000):
+    """Yields DataFrames of at most chunk_size order lines from a .csv or .parquet file"""
+    if str(path).lower().endswith((".parquet", ".pq")):
+        # Parquet needs pyarrow (pip install pyarrow); CSV works with pandas alone
+        import pyarrow.parquet as pq
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_size, columns=ORDER_COLUMNS):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(path, chunksize=chunk_size, usecols=ORDER_COLUMNS)
+
+# ---------------------------------------------------------
+# 1. MERGEABLE MOMENTS: count, sum, min, max, mean, m2
+# ---------------------------------------------------------
+
+def chunk_moments(values, keys):
+    """Partial aggregates of `values` per group, for one chunk"""
+    grouped = values.groupby(keys)
+    moments = grouped.agg(["count", "sum", "min", "max", "mean"])
+    # var(ddof=0) * count = sum of squared distances to the group mean
+    moments["m2"] = grouped.var(ddof=0) * moments["count"]
+    return moments
+
+def merge_moments(a, b):
+    """Merges two partial aggregate tables (groups missing on one side are copied from the other)"""
+    if a is None:
+        return b
+    a, b = a.align(b, join="outer")
+    na, nb = a["count"].fillna(0), b["count"].fillna(0)
+    n = na + nb
+    mean_a, mean_b = a["mean"].fillna(b["mean"]), b["mean"].fillna(a["mean"])
+    delta = mean_b - mean_a
+    merged = pd.DataFrame(index=a.index)
+    merged["count"] = n
+    merged["sum"] = a["sum"].fillna(0) + b["sum"].fillna(0)
+    merged["min"] = np.fmin(a["min"], b["min"])
+    merged["max"] = np.fmax(a["max"], b["max"])
+    # Chan et al.: the combined mean moves towards b proportionally to b's share of the rows,
+    # and m2 gains the spread between the two means
+    merged["mean"] = mean_a + delta * nb / n
+    merged["m2"] = a["m2"].fillna(0) + b["m2"].fillna(0) + delta ** 2 * na * nb / n
+    return merged
+
+def finish_moments(moments, columns):
+    """Turns partial aggregates into the pandas columns: sum, mean, min, max, count, std (sample std, like pandas)"""
+    stats = pd.DataFrame(index=moments.index)
+    stats["sum"] = moments["sum"]
+    stats["mean"] = moments["mean"]
+    stats["min"] = moments["min"]
+    stats["max"] = moments["max"]
+    stats["count"] = moments["count"].astype("int64")
+    stats["std"] = np.sqrt(moments["m2"] / (moments["count"] - 1)).where(moments["count"] > 1)
+    return stats[columns]
+
+# ---------------------------------------------------------
+# 2. DISTINCT COUNTS PER GROUP: exact sets or HyperLogLog
+# ---------------------------------------------------------
+
+class ExactDistinct:
+    """Keeps every distinct (key, value) pair: exact, memory grows with the number of pairs"""
+
+    def __init__(self):
+        self.pairs = None
+
+    def add(self, keys, values):
+        pairs = pd.DataFrame({"key": keys.to_numpy(), "value": values.to_numpy()}).drop_duplicates()
+        if self.pairs is not None:
+            pairs = pd.concat([self.pairs, pairs]).drop_duplicates()
+        self.pairs = pairs
+
+    def counts(self):
+        return self.pairs.groupby("key")["value"].nunique()
+
+class HyperLogLogDistinct:
+    """One HyperLogLog sketch per key: 2**precision bytes each, about 1.04 / sqrt(2**precision) relative error"""
+
+    def __init__(self, precision=14):
+        self.precision = precision
+        self.size = 1 << precision
+        self.registers = {}
+
+    def add(self, keys, values):
+        hashes = pd.util.hash_pandas_object(values, index=False).to_numpy()
+        # The first `precision` bits pick a register, the rest give the rank (position of the first 1 bit)
+        index = (hashes >> np.uint64(64 - self.precision)).astype(np.int64)
+        rest = hashes << np.uint64(self.precision)
+        # frexp gives the bit length exactly while the number fits in a float mantissa, hence the >> 11
+        _, bit_length = np.frexp((rest >> np.uint64(11)).astype(np.float64))
+        max_rank = 64 - self.precision + 1
+        rank = np.where(bit_length > 0, 64 - (bit_length + 11) + 1, max_rank).clip(max=max_rank).astype(np.uint8)
+        ranks = pd.DataFrame({"key": keys.to_numpy(), "index": index, "rank": rank})
+        for key, group in ranks.groupby("key"):
+            registers = self.registers.setdefault(key, np.zeros(self.size, dtype=np.uint8))
+            np.maximum.at(registers, group["index"].to_numpy(), group["rank"].to_numpy())
+
+    def estimate(self, registers):
+        alpha = 0.7213 / (1 + 1.079 / self.size)
+        estimate = alpha * self.size ** 2 / np.sum(np.ldexp(1.0, -registers.astype(np.int64)))
+        empty = np.count_nonzero(registers == 0)
+        if estimate <= 2.5 * self.size and empty:
+            # Small cardinalities: linear counting over the empty registers is more precise
+            estimate = self.size * np.log(self.size / empty)
+        return int(round(estimate))
+
+    def counts(self):
+        return pd.Series({key: self.estimate(registers) for key, registers in self.registers.items()}, dtype="int64")
+
+# ---------------------------------------------------------
+# 3. THE REPORTS OF dataframe01.py, ONE CHUNK AT A TIME
+# ---------------------------------------------------------
+
+class OrderStats:
+    """Feed it chunks of order lines with add(), then ask for the same tables dataframe01.py prints"""
+
+    def __init__(self, hll=False):
+        self.total = None
+        self.by_customer = None
+        self.by_customer_category = None
+        self.by_product = None
+        self.product_customers = HyperLogLogDistinct() if hll else ExactDistinct()
+        # dict keeps the order of first appearance, like Series.unique()
+        self.products = {}
+
+    def add(self, chunk):
+        total = chunk["quantity"] * chunk["unit_price"]
+        self.total = merge_moments(self.total, chunk_moments(total, np.zeros(len(chunk), dtype=np.int8)))
+        self.by_customer = merge_moments(self.by_customer, chunk_moments(total, chunk["customer"]))
+        self.by_customer_category = merge_moments(
+            self.by_customer_category, chunk_moments(total, [chunk["customer"], chunk["category"]])
+        )
+
+        # product_stats only needs sums and counts, which add up across chunks
+        grouped = chunk.assign(total=total).groupby("product")
+        part = pd.DataFrame({
+            "total_revenue": grouped["total"].sum(),
+            "unit_price_sum": grouped["unit_price"].sum(),
+            "unit_price_count": grouped["unit_price"].count(),
+            "times_sold": grouped["order_id"].count(),
+        })
+        self.by_product = part if self.by_product is None else self.by_product.add(part, fill_value=0)
+        self.product_customers.add(chunk["product"], chunk["customer"])
+        self.products.update(dict.fromkeys(chunk["product"].dropna()))
+
+    def summary(self):
+        stats = finish_moments(self.total, ["sum", "mean", "min", "max", "count", "std"])
+        return stats.iloc[0].rename("total")
+
+    def customer_stats(self):
+        return finish_moments(self.by_customer, ["sum", "mean", "min", "max", "count", "std"]).sort_index()
+
+    def customer_category_stats(self):
+        return finish_moments(self.by_customer_category, ["sum", "mean", "min", "max", "count"]).sort_index()
+
+    def product_stats(self):
+        stats = pd.DataFrame({
+            "total_revenue": self.by_product["total_revenue"],
+            "avg_unit_price": self.by_product["unit_price_sum"] / self.by_product["unit_price_count"],
+            "times_sold": self.by_product["times_sold"].astype("int64"),
+            "distinct_customers": self.product_customers.counts(),
+        })
+        stats.index.name = "product"
+        return stats.sort_index()
+
+    def unique_products(self):
+        return list(self.products)
+
+def stream_order_stats(path, chunk_size=100_000, hll=False):
+    """Reads an order export chunk by chunk and returns the filled OrderStats"""
+    stats = OrderStats(hll=hll)
+    for chunk in read_order_chunks(path, chunk_size):
+        stats.add(chunk)
+    return stats
+
+if __name__ == "__main__":
+    arguments = [value for value in sys.argv[1:] if value != "--hll"]
+    if not arguments:
+        print("Usage: python order_stream.py orders.csv [chunk_size] [--hll]")
+        sys.exit(1)
+    stats = stream_order_stats(arguments[0], int(arguments[1]) if len(arguments) > 1 else 100_000, "--hll" in sys.argv)
+
+    print("\n=== SUMMARY OF AGGREGATION FUNCTIONS ===")
+    print(stats.summary())
+    print("\n=== GROUP BY CUSTOMER ===")
+    print(stats.customer_stats())
+    print("\n=== GROUP BY CUSTOMER + CATEGORY ===")
+    print(stats.customer_category_stats())
+    print("\n=== PRODUCT LEVEL STATS ===")
+    print(stats.product_stats())
+    print("\nDistinct products:\t", len(stats.unique_products()))
+    print("Product list:\t\t", stats.unique_products())
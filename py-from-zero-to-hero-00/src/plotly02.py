@@ -2,6 +2,8 @@ import pandas as pd
 from plotly.subplots import make_subplots
 import plotly.graph_objects as go
 
+from order_cube import cube_for_frame, order_lines, sales_by
+
 # ---------------------------------------------------------
 # 1. CREATE A FAKE SHOPPING CART DATASET
 # ---------------------------------------------------------
@@ -25,37 +27,22 @@ data = {
 # which is like an in-memory table (rows + columns).
 df = pd.DataFrame(data)
 
-# Create a new column "total" = quantity * unit_price.
-# This represents the line total value for each item in the cart.
-df["total"] = df["quantity"] * df["unit_price"]
-
 # ---------------------------------------------------------
 # 2. AGGREGATIONS (GROUPING AND SUMMARIZING THE DATA)
 # ---------------------------------------------------------
-# Here we group the data and calculate the total revenue
-# per product, per customer, and per category.
-# Then we sort descending by total so the biggest values appear first.
-
-# Total revenue per product
-product_sales = (
-    df.groupby("product", as_index=False)["total"]
-      .sum()
-      .sort_values("total", ascending=False)
-)
+# order_cube.py computes "total" = quantity * unit_price and groups the lines once by
+# order_id x customer x product x category (the "cube"). It is cached on disk under a
+# hash of the data, so running this script again over the same data skips the groupby.
+cube = cube_for_frame(df)
 
-# Total revenue per customer
-customer_sales = (
-    df.groupby("customer", as_index=False)["total"]
-      .sum()
-      .sort_values("total", ascending=False)
-)
+# Each chart "rolls up" the cube: total revenue per product, per customer and per category,
+# sorted descending by total so the biggest values appear first.
+product_sales = sales_by(cube, "product")
+customer_sales = sales_by(cube, "customer")
+category_sales = sales_by(cube, "category")
 
-# Total revenue per category
-category_sales = (
-    df.groupby("category", as_index=False)["total"]
-      .sum()
-      .sort_values("total", ascending=False)
-)
+# One row per order line (quantity and line total) for the scatter plot
+lines = order_lines(cube)
 
 # ---------------------------------------------------------
 # 3. CREATING A 2x2 DASHBOARD LAYOUT WITH PLOTLY
@@ -123,11 +110,11 @@ fig.add_trace(
 # (4) Scatter plot: quantity vs total (row 2, col 2)
 fig.add_trace(
     go.Scatter(
-        x=df["quantity"],           # x-axis: quantity purchased
-        y=df["total"],              # y-axis: line total value
+        x=lines["quantity"],        # x-axis: quantity purchased
+        y=lines["total"],           # y-axis: line total value
         mode="markers",             # markers = dots in the scatter plot
         # Show product + customer in the hover text
-        text=df["product"] + " / " + df["customer"],
+        text=lines["product"] + " / " + lines["customer"],
         name="Quantity vs Total",
         # Custom tooltip using hovertemplate:
         # %{text} will show "Product / Customer"
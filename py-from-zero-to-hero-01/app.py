@@ -1,7 +1,14 @@
-from sqlalchemy.orm import Session
-from models import User, Group
+from sqlalchemy import select
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session, selectinload
+from models import User, Group, user_group_association
 from database import SessionLocal
+from bulk_io import KINDS, BulkImportError, export_rows, import_rows
+import membership_queries
+import argparse
 import os
+import sys
 
 def clear_screen():
     # For Windows, os.name returns 'nt', once Windows is based on the "Windows NT kernel"
@@ -22,47 +29,163 @@ def create_group(session, name):
     session.commit()
     print(f"Group '{name}' created!")
 
+def add_membership(session, user, group):
+    """Links a user to a group with INSERT OR IGNORE, so assigning twice is a no-op"""
+    stmt = insert(user_group_association).values(user_id=user.id, group_id=group.id).on_conflict_do_nothing()
+    added = session.execute(stmt).rowcount == 1
+    session.commit()
+    if added:
+        print(f"User '{user.name}' added to Group '{group.name}'")
+    else:
+        print(f"User '{user.name}' is already in Group '{group.name}'")
+
 def assign_user_to_group_by_id(session, user_id, group_id):
     """Assigns a user to a group"""
     user = session.get(User, user_id)
     group = session.get(Group, group_id)
 
     if user and group:
-        user.groups.append(group)
-        session.commit()
-        print(f"User '{user.name}' added to Group '{group.name}'")
+        add_membership(session, user, group)
     else:
         print("Invalid user or group ID.")
 
+def find_by_name(session, model, name, max_matches=5):
+    """Finds a user or group by exact name, else by name prefix, using the name index"""
+    exact = session.scalars(select(model).where(model.name == name).order_by(model.id).limit(max_matches)).all()
+    if exact:
+        return exact
+    # name >= 'ab' AND name < 'ab\U0010ffff' is a range scan on the index; LIKE '%ab%' would read every row
+    stmt = (
+        select(model)
+        .where(model.name >= name, model.name < name + "\U0010ffff")
+        .order_by(model.name, model.id)
+        .limit(max_matches)
+    )
+    return session.scalars(stmt).all()
+
 def assign_user_to_group_by_name(session, user_name, group_name):
     """Assigns a user to a group"""
-    user = session.query(User).filter(User.name.like(f"%{user_name}%")).first()
-    group = session.query(Group).filter(Group.name.like(f"%{group_name}%")).first()
+    users = find_by_name(session, User, user_name)
+    groups = find_by_name(session, Group, group_name)
 
-    if user and group:
-        user.groups.append(group)
-        session.commit()
-        print(f"User '{user.name}' added to Group '{group.name}'")
-    else:
+    if len(users) == 1 and len(groups) == 1:
+        add_membership(session, users[0], groups[0])
+    elif not users or not groups:
         print("Invalid user or group name.")
+    else:
+        # More than one candidate: ask for a more specific name instead of picking one at random
+        if len(users) > 1:
+            print(f"Ambiguous user name, matches: {', '.join(user.name for user in users)}")
+        if len(groups) > 1:
+            print(f"Ambiguous group name, matches: {', '.join(group.name for group in groups)}")
+
+def iter_pages(session, model, relation, limit=None, offset=0, page_size=1000):
+    """Yields pages of users or groups ordered by id, each one loaded with 2 queries (the rows + all their relations)"""
+    stmt = select(model).options(selectinload(relation)).order_by(model.id)
+    last_id = None
+    while limit is None or limit > 0:
+        size = page_size if limit is None else min(page_size, limit)
+        # offset only skips rows once, the next pages continue after the last id seen (keyset)
+        page_stmt = stmt.offset(offset) if last_id is None else stmt.where(model.id > last_id)
+        page = session.scalars(page_stmt.limit(size)).all()
+        if not page:
+            break
+        yield page
+        last_id = page[-1].id
+        if limit is not None:
+            limit -= len(page)
+        if len(page) < size:
+            break
+
+def list_users_and_groups(session, limit=None, offset=0, page_size=1000):
+    """Lists users with their assigned groups"""
+    for users in iter_pages(session, User, User.groups, limit, offset, page_size):
+        for user in users:
+            group_names = [obj.name for obj in user.groups]
+            print(f"👤 {user.id}, {user.name}: Groups → {', '.join(group_names) if group_names else 'No Groups'}")
+
+def list_groups_and_users(session, limit=None, offset=0, page_size=1000):
+    """Lists groups with their assigned users"""
+    for groups in iter_pages(session, Group, Group.users, limit, offset, page_size):
+        for group in groups:
+            user_names = [user.name for user in group.users]
+            print(f"👤 {group.id}, {group.name}: Users → {', '.join(user_names) if user_names else 'No Users'}")
+
+def query_memberships(session):
+    """Answers set questions about memberships: all of some groups, A but not B, groups sharing users"""
+    print("(a) Users in ALL of the groups")
+    print("(b) Users in group A but NOT in group B")
+    print("(c) Pairs of groups sharing at least K users")
+    choice = input("Enter choice: ")
+
+    if choice == "a":
+        group_ids = [int(value) for value in input("Enter Group IDs (comma separated): ").split(",")]
+        user_ids = membership_queries.user_ids_in_all_groups(session, group_ids)
+    elif choice == "b":
+        group_id = int(input("Enter Group A ID: "))
+        excluded_group_id = int(input("Enter Group B ID: "))
+        user_ids = membership_queries.user_ids_in_group_but_not(session, group_id, excluded_group_id)
+    elif choice == "c":
+        min_shared = int(input("Enter K: "))
+        for group_id, other_group_id, shared in membership_queries.groups_sharing_users(session, min_shared):
+            print(f"👥 Groups {group_id} & {other_group_id}: {shared} users in common")
+        return
+    else:
+        print("Invalid choice.")
+        return
 
-def list_users_and_groups(session):
-    """Lists all users with their assigned groups"""
-    users = session.query(User).all()
-    for user in users:
-        group_names = [obj.name for obj in user.groups]
-        print(f"👤 {user.id}, {user.name}: Groups → {', '.join(group_names) if group_names else 'No Groups'}")
+    for user in membership_queries.users_by_id(session, user_ids):
+        print(f"👤 {user.id}, {user.name}")
+    print(f"{len(user_ids)} users found")
 
-def list_groups_and_users(session):
-    """Lists all groups with their assigned users"""
-    groups = session.query(Group).all()
-    for group in groups:
-        user_names = [user.name for user in group.users]
-        print(f"👤 {group.id}, {group.name}: Users → {', '.join(user_names) if user_names else 'No Users'}")
+def import_file(session, kind, path, batch_size=1000):
+    """Imports users, groups or memberships from a CSV/JSONL file"""
+    total = import_rows(session, kind, path, batch_size)
+    print(f"{total} {kind} imported from '{path}'")
+
+def export_file(session, kind, path, batch_size=1000):
+    """Exports users, groups or memberships to a CSV/JSONL file"""
+    total = export_rows(session, kind, path, batch_size)
+    print(f"{total} {kind} exported to '{path}'")
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Users & Groups console app (no flags: interactive menu)")
+    parser.add_argument("--import", dest="imports", nargs=2, action="append", default=[], metavar=("KIND", "PATH"),
+                        help=f"import a .csv/.jsonl file, KIND is one of {', '.join(KINDS)} (repeatable)")
+    parser.add_argument("--export", dest="exports", nargs=2, action="append", default=[], metavar=("KIND", "PATH"),
+                        help="export to a .csv/.jsonl file (repeatable)")
+    parser.add_argument("--list", dest="listing", choices=("users", "groups"),
+                        help="print users with their groups (or groups with their users) and exit")
+    parser.add_argument("--limit", type=int, help="max rows printed by --list (default: all)")
+    parser.add_argument("--offset", type=int, default=0, help="rows skipped by --list")
+    parser.add_argument("--batch-size", type=int, default=1000, help="rows per INSERT/commit and per fetch")
+    args = parser.parse_args()
+    for kind, _ in args.imports + args.exports:
+        if kind not in KINDS:
+            parser.error(f"unknown KIND '{kind}', use one of {', '.join(KINDS)}")
+    return args
 
 def main():
+    args = parse_args()
     session = SessionLocal()
 
+    # Non-interactive mode: run the requested imports/exports/listing and leave
+    if args.imports or args.exports or args.listing:
+        try:
+            for kind, path in args.imports:
+                import_file(session, kind, path, args.batch_size)
+            for kind, path in args.exports:
+                export_file(session, kind, path, args.batch_size)
+        except (BulkImportError, OSError, ValueError, SQLAlchemyError) as exc:
+            session.close()
+            sys.exit(f"Import/export failed: {exc}")
+        if args.listing == "users":
+            list_users_and_groups(session, args.limit, args.offset, args.batch_size)
+        elif args.listing == "groups":
+            list_groups_and_users(session, args.limit, args.offset, args.batch_size)
+        session.close()
+        return
+
     while True:
         print("\n Choose an option:")
         print("(1)  Add User")
@@ -71,6 +194,9 @@ def main():
         print("(31) Assign User to Group - BY Name")
         print("(4)  List Users & Groups")
         print("(5)  List Groups & Users")
+        print("(6)  Import from CSV/JSONL")
+        print("(7)  Export to CSV/JSONL")
+        print("(8)  Membership queries")
         print("(9)  Exit")
         choice = input("Enter choice: ")
 
@@ -101,6 +227,31 @@ def main():
         elif choice == "5":
             list_groups_and_users(session)
 
+        elif choice == "6":
+            kind = input(f"What to import ({'/'.join(KINDS)}): ")
+            path = input("File path (.csv or .jsonl): ")
+            if kind in KINDS:
+                try:
+                    import_file(session, kind, path)
+                except (BulkImportError, OSError, ValueError, SQLAlchemyError) as exc:
+                    print(f"Import failed: {exc}")
+            else:
+                print("Invalid kind.")
+
+        elif choice == "7":
+            kind = input(f"What to export ({'/'.join(KINDS)}): ")
+            path = input("File path (.csv or .jsonl): ")
+            if kind in KINDS:
+                try:
+                    export_file(session, kind, path)
+                except (OSError, ValueError, SQLAlchemyError) as exc:
+                    print(f"Export failed: {exc}")
+            else:
+                print("Invalid kind.")
+
+        elif choice == "8":
+            query_memberships(session)
+
         elif choice == "9":
             print("Exiting...")
             break
@@ -0,0 +1,112 @@
+import csv
+import json
+from itertools import islice
+
+from sqlalchemy import select
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.exc import SQLAlchemyError
+
+from models import User, Group, user_group_association
+
+# What each import/export kind reads and writes: (table, columns)
+KINDS = {
+    "users": (User.__table__, ("id", "name")),
+    "groups": (Group.__table__, ("id", "name")),
+    "memberships": (user_group_association, ("user_id", "group_id")),
+}
+
+# Columns converted to int (empty values become None, so the database assigns the id)
+INT_COLUMNS = {"id", "user_id", "group_id"}
+
+class BulkImportError(Exception):
+    """An import that stopped partway: the `committed` rows of the earlier batches stay in the database"""
+
+    def __init__(self, message, committed):
+        super().__init__(message)
+        self.committed = committed
+
+def is_jsonl(path):
+    return path.lower().endswith((".jsonl", ".ndjson"))
+
+def _clean(record, columns):
+    row = {}
+    for column in columns:
+        value = record.get(column)
+        if column in INT_COLUMNS:
+            value = int(value) if value not in (None, "") else None
+        row[column] = value
+    return row
+
+def read_rows(path, columns):
+    """Yields one dict per record of a CSV (with header) or JSONL file, without loading the whole file"""
+    with open(path, newline="", encoding="utf-8") as file:
+        if is_jsonl(path):
+            for number, line in enumerate(file, 1):
+                if line.strip():
+                    try:
+                        record = json.loads(line)
+                        if not isinstance(record, dict):
+                            raise ValueError(f"expected a JSON object, got {type(record).__name__}")
+                        row = _clean(record, columns)
+                    except ValueError as exc:
+                        raise ValueError(f"line {number}: {exc}") from exc
+                    yield row
+        else:
+            reader = csv.DictReader(file)
+            for record in reader:
+                try:
+                    row = _clean(record, columns)
+                except ValueError as exc:
+                    raise ValueError(f"line {reader.line_num}: {exc}") from exc
+                yield row
+
+def import_rows(session, kind, path, batch_size=1000):
+    """Loads users, groups or memberships from CSV/JSONL with one multi-row INSERT and one commit per batch, returns the rows inserted.
+
+    A bad record or a failing batch raises BulkImportError: the batches before it stay committed.
+    """
+    table, columns = KINDS[kind]
+    stmt = insert(table)
+    if kind == "memberships":
+        # INSERT OR IGNORE: memberships that already exist are skipped instead of failing the batch
+        stmt = stmt.on_conflict_do_nothing()
+    rows = read_rows(path, columns)
+    total = records = 0
+    while True:
+        try:
+            batch = list(islice(rows, batch_size))
+        except (OSError, ValueError) as exc:
+            raise BulkImportError(f"reading '{path}' failed: {exc}; {total} {kind} committed before it", total) from exc
+        if not batch:
+            return total
+        # Core executemany: no ORM objects, no per-row flush
+        try:
+            total += session.execute(stmt, batch).rowcount
+            session.commit()
+        except SQLAlchemyError as exc:
+            session.rollback()
+            first, last = records + 1, records + len(batch)
+            # exc.orig is the driver's message, without the SQL and the parameters of the whole batch
+            reason = getattr(exc, "orig", None) or exc
+            raise BulkImportError(f"batch of records {first}-{last} failed: {reason}; {total} {kind} committed before it", total) from exc
+        records += len(batch)
+
+def export_rows(session, kind, path, batch_size=1000):
+    """Writes users, groups or memberships to CSV/JSONL, fetching batch_size rows at a time"""
+    table, columns = KINDS[kind]
+    stmt = select(*(table.c[column] for column in columns)).order_by(*(table.c[column] for column in columns))
+    # yield_per streams the rows from the cursor instead of loading the whole table
+    result = session.execute(stmt.execution_options(yield_per=batch_size))
+    total = 0
+    with open(path, "w", newline="", encoding="utf-8") as file:
+        if is_jsonl(path):
+            for row in result:
+                file.write(json.dumps(row._asdict()) + "\n")
+                total += 1
+        else:
+            writer = csv.writer(file)
+            writer.writerow(columns)
+            for row in result:
+                writer.writerow(row)
+                total += 1
+    return total
@@ -1,12 +1,37 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker
 
 # SQLite Database
 DATABASE_URL = "sqlite:///users_groups.db"
 
+# SQLite settings applied to every new connection (an empty dict keeps SQLite's defaults)
+# - journal_mode=WAL: readers no longer wait for the writer, and the writer no longer waits for readers
+# - synchronous=NORMAL: with WAL, fsync at checkpoints instead of at every commit (a power loss may drop the last commits, never corrupts)
+# - mmap_size: reads the file through memory mapping (256 MB) instead of read() calls
+# - cache_size: negative values are KiB, 64 MB of page cache per connection
+# - busy_timeout: waits up to 5 s for a lock instead of failing with "database is locked"
+SQLITE_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "mmap_size": 268435456,
+    "cache_size": -64000,
+    "busy_timeout": 5000,
+}
+
+def apply_pragmas(dbapi_connection, pragmas=SQLITE_PRAGMAS):
+    """Runs PRAGMA name=value for each setting on a raw sqlite3 connection"""
+    cursor = dbapi_connection.cursor()
+    for name, value in pragmas.items():
+        cursor.execute(f"PRAGMA {name}={value}")
+    cursor.close()
+
 # Factory function to create a Database connection
 # When echo=True is set, SQLAlchemy prints all SQL statements executed under the hood.
 engine = create_engine(DATABASE_URL, echo=False)
 
+@event.listens_for(engine, "connect")
+def _on_connect(dbapi_connection, connection_record):
+    apply_pragmas(dbapi_connection)
+
 # Creates a Session Factory
 SessionLocal = sessionmaker(bind=engine)
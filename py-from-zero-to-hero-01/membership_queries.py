@@ -0,0 +1,161 @@
+import time
+from collections import defaultdict
+from itertools import combinations
+
+from sqlalchemy import except_, func, select
+from sqlalchemy.orm import aliased
+
+from models import User, user_group_association as user_group
+
+# ---------------------------------------------------------------------------
+# Set-based SQL: the database does the set algebra, Python only reads the result
+# ---------------------------------------------------------------------------
+
+def user_ids_in_all_groups(session, group_ids):
+    """Ids of the users that belong to every group in group_ids (relational division with GROUP BY/HAVING)"""
+    group_ids = set(group_ids)
+    stmt = (
+        select(user_group.c.user_id)
+        .where(user_group.c.group_id.in_(group_ids))
+        .group_by(user_group.c.user_id)
+        .having(func.count(user_group.c.group_id) == len(group_ids))
+        .order_by(user_group.c.user_id)
+    )
+    return session.scalars(stmt).all()
+
+def user_ids_in_group_but_not(session, group_id, excluded_group_id):
+    """Ids of the users in group_id that aren't in excluded_group_id (EXCEPT)"""
+    stmt = except_(
+        select(user_group.c.user_id).where(user_group.c.group_id == group_id),
+        select(user_group.c.user_id).where(user_group.c.group_id == excluded_group_id),
+    ).order_by("user_id")
+    return session.scalars(stmt).all()
+
+def groups_sharing_users(session, min_shared):
+    """(group_id, other_group_id, shared_users) for every pair of groups with at least min_shared users in common"""
+    a, b = aliased(user_group), aliased(user_group)
+    shared = func.count().label("shared")
+    stmt = (
+        select(a.c.group_id, b.c.group_id.label("other_group_id"), shared)
+        .join(b, (a.c.user_id == b.c.user_id) & (a.c.group_id < b.c.group_id))
+        .group_by(a.c.group_id, b.c.group_id)
+        .having(shared >= min_shared)
+        .order_by(shared.desc(), a.c.group_id, b.c.group_id)
+    )
+    return [tuple(row) for row in session.execute(stmt)]
+
+def users_by_id(session, user_ids):
+    """Loads the users of a query result (one IN query per 500 ids)"""
+    users = {}
+    user_ids = list(user_ids)
+    for start in range(0, len(user_ids), 500):
+        chunk = user_ids[start:start + 500]
+        users.update((user.id, user) for user in session.scalars(select(User).where(User.id.in_(chunk))))
+    return [users[user_id] for user_id in user_ids if user_id in users]
+
+# ---------------------------------------------------------------------------
+# In-memory bitmap index: one Python int per group, bit N set when user N is a member
+# ---------------------------------------------------------------------------
+
+# Bit positions set in each byte value: decoding reads the int one byte at a time instead of
+# clearing one bit per member, which would copy the whole int each time (O(members x max id))
+BYTE_BITS = [tuple(bit for bit in range(8) if value >> bit & 1) for value in range(256)]
+
+def ids_to_bits(ids):
+    """One int with bit N set for every N in ids, built in a single pass over a bytearray"""
+    ids = list(ids)
+    if not ids:
+        return 0
+    data = bytearray(max(ids) // 8 + 1)
+    for user_id in ids:
+        data[user_id >> 3] |= 1 << (user_id & 7)
+    return int.from_bytes(data, "little")
+
+def bits_to_ids(bits):
+    """Positions of the set bits, in ascending order"""
+    ids = []
+    for index, value in enumerate(bits.to_bytes((bits.bit_length() + 7) // 8, "little")):
+        if value:
+            base = index * 8
+            ids.extend(base + bit for bit in BYTE_BITS[value])
+    return ids
+
+class MembershipBitmap:
+    """Snapshot of user_group for repeated queries: AND/ANDNOT/popcount on ints instead of round trips.
+
+    It isn't updated by later writes, call refresh() (or build a new one) after changing memberships.
+    """
+
+    def __init__(self, session, batch_size=10000):
+        self.session = session
+        self.batch_size = batch_size
+        self.groups = {}
+        self.refresh()
+
+    def refresh(self):
+        members = defaultdict(list)
+        stmt = select(user_group.c.group_id, user_group.c.user_id).execution_options(yield_per=self.batch_size)
+        for group_id, user_id in self.session.execute(stmt):
+            members[group_id].append(user_id)
+        # Each int is built once: `bits |= 1 << user_id` per row would copy the growing int every time
+        self.groups = {group_id: ids_to_bits(user_ids) for group_id, user_ids in members.items()}
+
+    def user_ids_in_all_groups(self, group_ids):
+        bits = None
+        for group_id in set(group_ids):
+            group_bits = self.groups.get(group_id, 0)
+            bits = group_bits if bits is None else bits & group_bits
+        return bits_to_ids(bits or 0)
+
+    def user_ids_in_group_but_not(self, group_id, excluded_group_id):
+        return bits_to_ids(self.groups.get(group_id, 0) & ~self.groups.get(excluded_group_id, 0))
+
+    def groups_sharing_users(self, min_shared):
+        pairs = []
+        for (group_id, bits), (other_group_id, other_bits) in combinations(sorted(self.groups.items()), 2):
+            shared = (bits & other_bits).bit_count()
+            if shared >= min_shared:
+                pairs.append((group_id, other_group_id, shared))
+        pairs.sort(key=lambda pair: (-pair[2], pair[0], pair[1]))
+        return pairs
+
+# ---------------------------------------------------------------------------
+# Benchmark: python membership_queries.py [repeat]
+# ---------------------------------------------------------------------------
+
+def _timed(fn, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = fn()
+    return result, (time.perf_counter() - start) / repeat * 1000
+
+def benchmark(session, repeat=20):
+    """Runs the same questions through SQL and the bitmap index, checks they agree and prints the average ms"""
+    group_ids = session.scalars(
+        select(user_group.c.group_id).group_by(user_group.c.group_id).order_by(func.count().desc()).limit(3)
+    ).all()
+    if len(group_ids) < 2:
+        print("Add at least 2 groups with members before running the benchmark.")
+        return
+
+    bitmap, build_ms = _timed(lambda: MembershipBitmap(session), 1)
+    min_shared = max(1, len(bitmap.user_ids_in_all_groups(group_ids[:2])) // 2)
+    questions = {
+        f"users in all of {group_ids}": ("user_ids_in_all_groups", (group_ids,)),
+        f"users in {group_ids[0]} but not {group_ids[1]}": ("user_ids_in_group_but_not", group_ids[:2]),
+        f"group pairs sharing >= {min_shared} users": ("groups_sharing_users", (min_shared,)),
+    }
+    print(f"Bitmap index built in {build_ms:.1f} ms ({len(bitmap.groups)} groups)")
+    for label, (name, args) in questions.items():
+        sql_result, sql_ms = _timed(lambda: globals()[name](session, *args), repeat)
+        bitmap_result, bitmap_ms = _timed(lambda: getattr(bitmap, name)(*args), repeat)
+        status = "ok" if list(sql_result) == list(bitmap_result) else "MISMATCH"
+        print(f"{label}: {len(sql_result)} rows | SQL {sql_ms:.2f} ms | bitmap {bitmap_ms:.2f} ms | {status}")
+
+if __name__ == "__main__":
+    import sys
+    from database import SessionLocal
+
+    session = SessionLocal()
+    benchmark(session, int(sys.argv[1]) if len(sys.argv) > 1 else 20)
+    session.close()
@@ -1,15 +1,16 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, Table
+from sqlalchemy import Column, Integer, String, ForeignKey, Table, inspect
 from sqlalchemy.orm import relationship, declarative_base
 from database import engine
 
 Base = declarative_base()
 
 # Many-to-Many Association Table (Group x User)
+# The composite primary key makes a membership unique and indexes lookups by user_id
 user_group_association = Table(
     "user_group",
     Base.metadata,
-    Column("user_id", Integer, ForeignKey("users.id")),
-    Column("group_id", Integer, ForeignKey("groups.id")),
+    Column("user_id", Integer, ForeignKey("users.id"), primary_key=True),
+    Column("group_id", Integer, ForeignKey("groups.id"), primary_key=True),
 )
 
 # User Model
@@ -18,7 +19,7 @@ class User(Base):
 
     # Fields defs
     id = Column(Integer, primary_key=True)
-    name = Column(String, nullable=False)
+    name = Column(String, nullable=False, index=True)
 
     # Many-to-Many Relationship
     groups = relationship("Group", secondary=user_group_association, back_populates="users")
@@ -32,7 +33,7 @@ class Group(Base):
 
     # Fields defs
     id = Column(Integer, primary_key=True)
-    name = Column(String, nullable=False)
+    name = Column(String, nullable=False, index=True)
 
     # Many-to-Many Relationship
     users = relationship("User", secondary=user_group_association, back_populates="groups")
@@ -40,5 +41,23 @@ class Group(Base):
     def __repr__(self):
         return f"Group(id={self.id}, name='{self.name}')"
 
+def upgrade_existing_tables(engine):
+    """Brings databases created before the indexes/primary key up to date (create_all skips existing tables)"""
+    inspector = inspect(engine)
+    with engine.begin() as conn:
+        if not inspector.get_pk_constraint("user_group")["constrained_columns"]:
+            # SQLite can't add a primary key in place: rebuild the table, dropping duplicated memberships
+            conn.exec_driver_sql("ALTER TABLE user_group RENAME TO user_group_old")
+            user_group_association.create(conn)
+            conn.exec_driver_sql(
+                "INSERT OR IGNORE INTO user_group (user_id, group_id) "
+                "SELECT user_id, group_id FROM user_group_old WHERE user_id IS NOT NULL AND group_id IS NOT NULL"
+            )
+            conn.exec_driver_sql("DROP TABLE user_group_old")
+        for table in (User.__table__, Group.__table__):
+            for index in table.indexes:
+                index.create(conn, checkfirst=True)
+
 # Create tables in the database
 Base.metadata.create_all(engine)
+upgrade_existing_tables(engine)
@@ -0,0 +1,83 @@
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+
+from sqlalchemy import create_engine, event, text
+
+from database import SQLITE_PRAGMAS, apply_pragmas
+
+# python sqlite_benchmark.py [seconds] [readers] [writers]
+# Runs the same mixed workload against a scratch database twice: with SQLite's defaults and with SQLITE_PRAGMAS.
+
+ROWS = 20000
+
+def make_engine(path, pragmas):
+    engine = create_engine(f"sqlite:///{path}", pool_size=32, max_overflow=0)
+    event.listen(engine, "connect", lambda dbapi_connection, connection_record: apply_pragmas(dbapi_connection, pragmas))
+    return engine
+
+def seed(engine):
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE users (id INTEGER PRIMARY KEY, name VARCHAR NOT NULL)"))
+        conn.execute(text("INSERT INTO users (name) VALUES (:name)"), [{"name": f"user{i}"} for i in range(ROWS)])
+
+def reader(engine, stop, counts):
+    done = errors = 0
+    with engine.connect() as conn:
+        while not stop.is_set():
+            start = random.randint(1, ROWS)
+            try:
+                conn.execute(text("SELECT id, name FROM users WHERE id BETWEEN :a AND :b"), {"a": start, "b": start + 50}).all()
+                conn.commit()
+                done += 1
+            except Exception:
+                conn.rollback()
+                errors += 1
+    counts.append(("read", done, errors))
+
+def writer(engine, stop, counts):
+    done = errors = 0
+    with engine.connect() as conn:
+        while not stop.is_set():
+            try:
+                conn.execute(text("INSERT INTO users (name) VALUES (:name)"), {"name": "new"})
+                conn.execute(text("UPDATE users SET name = name WHERE id = :id"), {"id": random.randint(1, ROWS)})
+                conn.commit()
+                done += 1
+            except Exception:
+                conn.rollback()
+                errors += 1
+    counts.append(("write", done, errors))
+
+def run(label, pragmas, seconds, readers, writers):
+    with tempfile.TemporaryDirectory() as folder:
+        engine = make_engine(os.path.join(folder, "bench.db"), pragmas)
+        seed(engine)
+        stop, counts = threading.Event(), []
+        threads = [threading.Thread(target=reader, args=(engine, stop, counts)) for _ in range(readers)]
+        threads += [threading.Thread(target=writer, args=(engine, stop, counts)) for _ in range(writers)]
+        for thread in threads:
+            thread.start()
+        time.sleep(seconds)
+        stop.set()
+        for thread in threads:
+            thread.join()
+        engine.dispose()
+
+    totals = {kind: [0, 0] for kind in ("read", "write")}
+    for kind, done, errors in counts:
+        totals[kind][0] += done
+        totals[kind][1] += errors
+    (reads, read_errors), (writes, write_errors) = totals["read"], totals["write"]
+    print(f"{label:<10} reads/s: {reads / seconds:>9.0f}  writes/s: {writes / seconds:>7.0f}  errors: {read_errors + write_errors}")
+
+if __name__ == "__main__":
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 5
+    readers = int(sys.argv[2]) if len(sys.argv) > 2 else 8
+    writers = int(sys.argv[3]) if len(sys.argv) > 3 else 2
+    print(f"{readers} reader threads, {writers} writer threads, {seconds:g} s each")
+    run("defaults", {}, seconds, readers, writers)
+    run("tuned", SQLITE_PRAGMAS, seconds, readers, writers)
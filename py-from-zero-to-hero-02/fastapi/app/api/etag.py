@@ -0,0 +1,58 @@
+import hashlib
+
+from fastapi import HTTPException, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.serialization import ENCODINGS, VARY, accepted_encodings, encoded_etag
+from app.core.config import settings
+from app.uow import versions
+
+async def compute_etag(session: AsyncSession, tables: tuple[str, ...], *parts) -> str:
+    """Strong ETag derived from the table versions (one PK lookup) and the request parts."""
+    table_versions = await versions.get_versions(session, tables)
+    raw = "|".join([*(f"{t}={v}" for t, v in sorted(table_versions.items())), *map(str, parts)])
+    return '"' + hashlib.sha256(raw.encode()).hexdigest()[:32] + '"'
+
+def is_not_modified(request: Request, etag: str) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    # If-None-Match uses the weak comparison, so W/"x" matches "x"; compressed
+    # representations carry an encoding suffix ("x-gzip") that is ignored here as well.
+    candidates = {_strip_encoding(tag.strip().removeprefix("W/")) for tag in if_none_match.split(",")}
+    return "*" in candidates or etag in candidates
+
+def _strip_encoding(tag: str) -> str:
+    for encoding in ENCODINGS:
+        suffix = f'-{encoding}"'
+        if tag.endswith(suffix):
+            return tag[: -len(suffix)] + '"'
+    return tag
+
+def _held_encoding(request: Request, etag: str) -> str | None:
+    """Encoding of the representation the client revalidates, if it was compressed and is still acceptable."""
+    accepted = accepted_encodings(request)
+    tags = {tag.strip().removeprefix("W/") for tag in request.headers.get("if-none-match", "").split(",")}
+    for encoding in ENCODINGS:
+        if encoding in accepted and encoded_etag(etag, encoding) in tags:
+            return encoding
+    return None
+
+def expected_version(request: Request, body_version: int | None) -> int | None:
+    """Row version a write is conditioned on: the payload's `version`, else `If-Match: "<version>"`."""
+    if body_version is not None:
+        return body_version
+    if_match = request.headers.get("if-match", "").strip()
+    if not if_match or if_match == "*":
+        return None
+    try:
+        return int(if_match.removeprefix("W/").strip('"'))
+    except ValueError:
+        raise HTTPException(status_code=400, detail='If-Match must be a row version, e.g. "3"') from None
+
+def not_modified(request: Request, etag: str) -> Response:
+    """304 with the same validator (encoding suffix included) as the 200 it confirms."""
+    headers = {"ETag": encoded_etag(etag, _held_encoding(request, etag))}
+    if settings.FAST_SERIALIZATION:
+        headers["Vary"] = VARY
+    return Response(status_code=304, headers=headers)
@@ -0,0 +1,41 @@
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.db.query_stats import QueryStats, current_stats, query_metrics
+
+def server_timing(stats: QueryStats) -> str:
+    """`Server-Timing` value: total DB time with the query count, and the slowest statement."""
+    return (
+        f'db;dur={stats.total_seconds * 1000:.3f};desc="{stats.count} queries", '
+        f"db-slowest;dur={stats.slowest_seconds * 1000:.3f}"
+    )
+
+class QueryStatsMiddleware:
+    """Counts the SQL statements of each request, reports them in `Server-Timing` and aggregates them per route.
+
+    Plain ASGI middleware: the header is added when the response starts, after the endpoint has run.
+    Statements issued while a streaming body is being sent are aggregated but not in the header.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        stats = QueryStats()
+        token = current_stats.set(stats)
+
+        async def send_with_timing(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message).append("Server-Timing", server_timing(stats))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            current_stats.reset(token)
+            route = scope.get("route")
+            if route is not None:
+                query_metrics.add(f"{scope['method']} {route.path}", stats)
@@ -0,0 +1,34 @@
+from fastapi import APIRouter
+
+from app.api.routes.sku import create_coalescer
+from app.api.serialization import ORJSONResponse
+from app.db.pool import pool_status
+from app.db.query_stats import query_metrics
+from app.db.session import engine
+from app.uow import sku as sku_crud
+from app.uow import uom as uom_crud
+
+router = APIRouter(prefix="/internal", tags=["internal"], default_response_class=ORJSONResponse)
+
+@router.get("/uom-cache")
+async def uom_cache_stats():
+    return uom_crud.cache.stats()
+
+@router.get("/sku-stats-cache")
+async def sku_stats_cache_stats():
+    return sku_crud.stats_cache.stats()
+
+@router.get("/db-pool")
+async def db_pool_stats():
+    return pool_status(engine.pool)
+
+@router.get("/sku-create-coalescer")
+async def sku_create_coalescer_stats():
+    return create_coalescer.stats()
+
+@router.get("/query-stats")
+async def query_stats(reset: bool = False):
+    snapshot = query_metrics.snapshot()
+    if reset:
+        query_metrics.reset()
+    return snapshot
@@ -1,54 +1,401 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+import csv
+import io
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from pydantic import TypeAdapter, ValidationError
+from sqlalchemy import Row
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.deps import get_session
-from app.schemas.sku import SkuCreate, SkuGetOut, SkuUpdate, SkuOut
+from app.api.etag import compute_etag, expected_version, is_not_modified, not_modified
+from app.api.serialization import encode_response, response_format
+from app.api.streaming import NEXT_CURSOR_HEADER, ndjson_response, set_next_cursor
+from app.core.coalescer import WriteCoalescer
+from app.core.config import settings
+from app.db.conflicts import FOREIGN_KEY, constraint_writes_enabled, violated_column
+from app.db.session import AsyncSessionLocal, engine
+from app.models.sku import Sku
+from app.models.uom import UnitOfMeasurement
+from app.schemas.sku import (
+    SkuBulkError, SkuBulkOut, SkuCreate, SkuGetOut, SkuPriceItem, SkuPriceRule, SkuPriceStats, SkuPriceUpdateOut,
+    SkuUpdate, SkuOut,
+)
 from app.uow import sku as crud
 from app.uow import uom as uom_crud
 
 router = APIRouter(prefix="/skus", tags=["skus"])
 
+# Tables whose versions make up the ETag of read responses.
+READ_TABLES = (Sku.__tablename__, UnitOfMeasurement.__tablename__)
+
+# Price statistics only depend on the SKU rows.
+STATS_TABLES = (Sku.__tablename__,)
+
+# Prebuilt serializers for FAST_SERIALIZATION (building a TypeAdapter per request is costly).
+LIST_ADAPTER = TypeAdapter(list[SkuGetOut])
+ITEM_ADAPTER = TypeAdapter(SkuGetOut)
+STATS_ADAPTER = TypeAdapter(list[SkuPriceStats])
+
+# Unique column -> 409 message when a write trips a constraint (WRITE_MODE=constraint).
+CONFLICT_DETAILS = {
+    "code": "SKU code is already taken",
+    "description": "SKU description is already taken",
+}
+
 @router.get("", response_model=list[SkuGetOut])
-async def list_all(session: AsyncSession = Depends(get_session)):
-    return await crud.get_all(session)
+async def list_all(
+    request: Request,
+    response: Response,
+    limit: int | None = Query(None, ge=1, le=settings.PAGE_SIZE_MAX),
+    after: int | None = Query(None, ge=0, description="Return SKUs with id greater than this cursor"),
+    stream: bool = Query(False, description="Stream every SKU as NDJSON"),
+    session: AsyncSession = Depends(get_session),
+):
+    # Polling clients send If-None-Match: answer from the table versions without reading any rows.
+    etag = await compute_etag(session, READ_TABLES, limit, after, stream, response_format(request))
+    if is_not_modified(request, etag):
+        return not_modified(request, etag)
+    headers = {"ETag": etag}
+    if stream:
+        return ndjson_response(crud.stream_all, SkuGetOut, after=after, headers=headers)
+    if limit is None and after is None:
+        rows = await crud.get_all(session)
+    else:
+        limit = limit or settings.PAGE_SIZE_DEFAULT
+        rows = await crud.get_page(session, limit, after)
+        set_next_cursor(headers, rows, limit)
+    if settings.FAST_SERIALIZATION:
+        return encode_response(request, LIST_ADAPTER, rows, headers)
+    response.headers.update(headers)
+    return rows
+
+@router.get("/stats", response_model=list[SkuPriceStats])
+async def price_stats(
+    request: Request,
+    response: Response,
+    uom_id: list[int] | None = Query(None, description="Only these UOMs (repeat the parameter)"),
+    min_price: float | None = Query(None, ge=0),
+    max_price: float | None = Query(None, ge=0),
+    session: AsyncSession = Depends(get_session),
+):
+    """count/min/max/avg/sum of unit_price per UOM, computed in SQL."""
+    uom_ids = sorted(set(uom_id)) if uom_id else None
+    etag = await compute_etag(
+        session, STATS_TABLES, "stats", uom_ids, min_price, max_price, response_format(request)
+    )
+    if is_not_modified(request, etag):
+        return not_modified(request, etag)
+    rows = await crud.stats_cache.get_or_load(
+        etag, lambda: crud.get_price_stats(session, uom_ids, min_price, max_price)
+    )
+    if settings.FAST_SERIALIZATION:
+        return encode_response(request, STATS_ADAPTER, rows, {"ETag": etag})
+    response.headers["ETag"] = etag
+    return rows
+
+def _parse_search_cursor(after: str) -> tuple[float, int]:
+    score, _, sku_id = after.rpartition(":")
+    try:
+        return float(score), int(sku_id)
+    except ValueError:
+        raise HTTPException(status_code=422, detail="Invalid search cursor") from None
+
+# Declared before /{sku_id} so "search" is not parsed as an id.
+@router.get("/search", response_model=list[SkuGetOut])
+async def search(
+    request: Request,
+    response: Response,
+    q: str = Query(..., min_length=1, max_length=100, description="Code prefix or description words"),
+    limit: int = Query(settings.SEARCH_LIMIT_DEFAULT, ge=1, le=settings.PAGE_SIZE_MAX),
+    after: str | None = Query(None, description="X-Next-Cursor of the previous page"),
+    session: AsyncSession = Depends(get_session),
+):
+    cursor = _parse_search_cursor(after) if after else None
+    results = await crud.search(session, q.strip(), limit, cursor)
+    rows = [obj for obj, _ in results]
+    headers = {}
+    if len(results) == limit:
+        last, score = results[-1]
+        headers[NEXT_CURSOR_HEADER] = f"{score!r}:{last.id}"
+    if settings.FAST_SERIALIZATION:
+        return encode_response(request, LIST_ADAPTER, rows, headers)
+    response.headers.update(headers)
+    return rows
+
+@router.get("/{sku_id}", response_model=SkuGetOut)
+async def get_one(
+    sku_id: int, request: Request, response: Response, session: AsyncSession = Depends(get_session)
+):
+    etag = await compute_etag(session, READ_TABLES, "detail", sku_id, response_format(request))
+    if is_not_modified(request, etag):
+        return not_modified(request, etag)
+    obj = await crud.get_out_by_id(session, sku_id)
+    if not obj:
+        raise HTTPException(404, "SKU not found")
+    if settings.FAST_SERIALIZATION:
+        return encode_response(request, ITEM_ADAPTER, obj, {"ETag": etag})
+    response.headers["ETag"] = etag
+    return obj
+
+async def _check_create(session: AsyncSession, payload: SkuCreate) -> None:
+    uom = await uom_crud.get_cached(session, payload.uom_id)
+    if not uom:
+        raise HTTPException(404, "UOM not found")
+    code_exists = await crud.get_by_code(session, payload.code)
+    if code_exists:
+        raise HTTPException(status_code=409, detail="SKU code is already taken")
+    description_exists = await crud.get_by_description(session, payload.description)
+    if description_exists:
+        raise HTTPException(status_code=409, detail="SKU description is already taken")
+
+def _integrity_error(exc: IntegrityError) -> HTTPException:
+    column = violated_column(exc)
+    if column in ("uom_id", FOREIGN_KEY):
+        return HTTPException(404, "UOM not found")
+    detail = CONFLICT_DETAILS.get(column, "SKU conflicts with an existing SKU")
+    return HTTPException(status_code=409, detail=detail)
+
+async def _create_batch(payloads: list[SkuCreate]) -> list[Row | HTTPException]:
+    """Insert SKUs queued by concurrent POST /skus with one statement, one result per payload."""
+    async with AsyncSessionLocal() as session, session.begin():
+        results: list[Row | HTTPException | None] = [None] * len(payloads)
+        rows, seen_codes, seen_descriptions = [], set(), set()
+        # One IN (...) query against the database, not the UOM cache, which can be stale.
+        uom_ids = await uom_crud.get_existing_ids(session, list({p.uom_id for p in payloads}))
+        for i, payload in enumerate(payloads):
+            if payload.uom_id not in uom_ids:
+                results[i] = HTTPException(404, "UOM not found")
+            elif payload.code in seen_codes:
+                results[i] = HTTPException(status_code=409, detail="SKU code is already taken")
+            elif payload.description in seen_descriptions:
+                results[i] = HTTPException(status_code=409, detail="SKU description is already taken")
+            else:
+                seen_codes.add(payload.code)
+                seen_descriptions.add(payload.description)
+                rows.append(payload.model_dump())
+        failed: dict[str, HTTPException] = {}
+        try:
+            async with session.begin_nested():
+                inserted = await crud.insert_many_returning(session, rows)
+        except IntegrityError:
+            # One bad row (e.g. its UOM was deleted meanwhile) must not fail the others: retry them one by one.
+            inserted = {}
+            for row in rows:
+                try:
+                    async with session.begin_nested():
+                        inserted.update(await crud.insert_many_returning(session, [row]))
+                except IntegrityError as exc:
+                    failed[row["code"]] = _integrity_error(exc)
+        # Only rows skipped by ON CONFLICT need a lookup to explain which key was taken.
+        skipped = [row["code"] for row in rows if row["code"] not in inserted and row["code"] not in failed]
+        taken_codes = await crud.get_existing_codes(session, skipped) if skipped else set()
+    for i, payload in enumerate(payloads):
+        if results[i] is not None:
+            continue
+        if payload.code in inserted:
+            results[i] = inserted[payload.code]
+        elif payload.code in failed:
+            results[i] = failed[payload.code]
+        elif payload.code in taken_codes:
+            results[i] = HTTPException(status_code=409, detail="SKU code is already taken")
+        else:
+            results[i] = HTTPException(status_code=409, detail="SKU description is already taken")
+    return results
+
+create_coalescer: WriteCoalescer[SkuCreate, Row] = WriteCoalescer(
+    _create_batch,
+    window_seconds=settings.SKU_CREATE_COALESCE_WINDOW_MS / 1000,
+    max_size=settings.SKU_CREATE_COALESCE_MAX_ROWS,
+)
+
+# Coalescing relies on INSERT ... ON CONFLICT DO NOTHING RETURNING.
+COALESCE_CREATES = settings.SKU_CREATE_COALESCE and engine.dialect.name in ("postgresql", "sqlite")
 
 @router.post("", response_model=SkuOut, status_code=status.HTTP_201_CREATED)
 async def create(payload: SkuCreate, session: AsyncSession = Depends(get_session)):
+    if COALESCE_CREATES:
+        try:
+            return await create_coalescer.submit(payload)
+        except IntegrityError as exc:
+            raise _integrity_error(exc) from exc
+    async with session.begin():
+        if not constraint_writes_enabled(session):
+            await _check_create(session, payload)
+            try:
+                return await crud.create(
+                    session, payload.code, payload.description, payload.unit_price, payload.uom_id
+                )
+            except IntegrityError as exc:
+                # The checks can pass on stale data (cached UOM deleted, concurrent insert): the flush still fails.
+                raise _integrity_error(exc) from exc
+        try:
+            row = await crud.create_returning(
+                session, payload.code, payload.description, payload.unit_price, payload.uom_id
+            )
+        except IntegrityError as exc:
+            raise _integrity_error(exc) from exc
+        if row is None:
+            # Nothing was inserted: the checks only run on this (rare) path to explain why.
+            await _check_create(session, payload)
+            raise HTTPException(status_code=409, detail="SKU conflicts with an existing SKU")
+        return row
+
+async def _read_bulk_rows(request: Request) -> list[dict]:
+    content_type = request.headers.get("content-type", "application/json")
+    if content_type.startswith("text/csv"):
+        text = (await request.body()).decode("utf-8-sig")
+        return list(csv.DictReader(io.StringIO(text)))
+    if not content_type.startswith("application/json"):
+        raise HTTPException(status_code=415, detail="Use application/json or text/csv")
+    try:
+        data = await request.json()
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid JSON body")
+    if not isinstance(data, list):
+        raise HTTPException(status_code=422, detail="Expected a JSON array of SKUs")
+    return data
+
+def _parse_bulk_rows(rows: list[dict]) -> tuple[list[tuple[int, SkuCreate]], list[SkuBulkError]]:
+    payloads: list[tuple[int, SkuCreate]] = []
+    errors: list[SkuBulkError] = []
+    for row_number, row in enumerate(rows, start=1):
+        try:
+            payloads.append((row_number, SkuCreate.model_validate(row)))
+        except ValidationError as exc:
+            detail = "; ".join(
+                f"{'.'.join(map(str, e['loc']))}: {e['msg']}" if e["loc"] else e["msg"] for e in exc.errors()
+            )
+            code = row.get("code") if isinstance(row, dict) else None
+            errors.append(SkuBulkError(row=row_number, code=code, detail=detail))
+    return payloads, errors
+
+async def _check_bulk_rows(
+    session: AsyncSession, payloads: list[tuple[int, SkuCreate]], errors: list[SkuBulkError]
+) -> list[SkuCreate]:
+    # A few IN (...) queries over the whole batch replace the per-row uniqueness lookups.
+    uom_ids = await uom_crud.get_existing_ids(session, list({p.uom_id for _, p in payloads}))
+    taken_codes = await crud.get_existing_codes(session, list({p.code for _, p in payloads}))
+    taken_descriptions = await crud.get_existing_descriptions(
+        session, list({p.description for _, p in payloads})
+    )
+    valid: list[SkuCreate] = []
+    for row_number, payload in payloads:
+        if payload.uom_id not in uom_ids:
+            detail = "UOM not found"
+        elif payload.code in taken_codes:
+            detail = "SKU code is already taken"
+        elif payload.description in taken_descriptions:
+            detail = "SKU description is already taken"
+        else:
+            # Later rows of the same batch must not reuse this code/description either.
+            taken_codes.add(payload.code)
+            taken_descriptions.add(payload.description)
+            valid.append(payload)
+            continue
+        errors.append(SkuBulkError(row=row_number, code=payload.code, detail=detail))
+    return valid
+
+@router.post(
+    "/bulk",
+    response_model=SkuBulkOut,
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                "application/json": {
+                    "schema": {"type": "array", "items": SkuCreate.model_json_schema()}
+                },
+                "text/csv": {"schema": {"type": "string", "example": "code,description,unit_price,uom_id"}},
+            },
+        }
+    },
+)
+async def bulk_create(
+    request: Request,
+    batch_size: int = Query(settings.BULK_BATCH_SIZE, ge=1, le=10_000),
+    session: AsyncSession = Depends(get_session),
+):
+    """Import many SKUs at once; invalid rows are reported and the rest is inserted."""
+    payloads, errors = _parse_bulk_rows(await _read_bulk_rows(request))
     async with session.begin():
-        uom = await uom_crud.get_by_id(session, payload.uom_id)
-        if not uom:
-            raise HTTPException(404, "UOM not found")
-        code_exists = await crud.get_by_code(session, payload.code)
-        if code_exists:
-            raise HTTPException(status_code=409, detail="SKU code is already taken")
-        description_exists = await crud.get_by_description(session, payload.description)
-        if description_exists:
-            raise HTTPException(status_code=409, detail="SKU description is already taken")
-        return await crud.create(session, payload.code, payload.description, payload.unit_price, payload.uom_id)
+        valid = await _check_bulk_rows(session, payloads, errors)
+        created = await crud.bulk_create(session, [p.model_dump() for p in valid], batch_size)
+    errors.sort(key=lambda e: e.row)
+    return SkuBulkOut(created=created, errors=errors)
+
+@router.patch("/prices", response_model=SkuPriceUpdateOut)
+async def update_prices(
+    payload: list[SkuPriceItem] | SkuPriceRule, session: AsyncSession = Depends(get_session)
+):
+    async with session.begin():
+        if isinstance(payload, SkuPriceRule):
+            if payload.uom_id is not None and not await uom_crud.get_cached(session, payload.uom_id):
+                raise HTTPException(404, "UOM not found")
+            try:
+                updated = await crud.adjust_prices(session, payload.percent, payload.uom_id)
+            except ValueError as exc:
+                raise HTTPException(status_code=422, detail=str(exc)) from None
+            return SkuPriceUpdateOut(updated=updated)
+        # Later entries win when the same SKU is listed twice.
+        by_id = {item.id: item.unit_price for item in payload if item.id is not None}
+        by_code = {item.code: item.unit_price for item in payload if item.id is None}
+        matched_ids = await crud.update_prices(session, by_id, "id", settings.BULK_BATCH_SIZE)
+        matched_codes = await crud.update_prices(session, by_code, "code", settings.BULK_BATCH_SIZE)
+    not_found = [key for key in by_id if key not in matched_ids]
+    not_found += [key for key in by_code if key not in matched_codes]
+    return SkuPriceUpdateOut(updated=len(matched_ids) + len(matched_codes), not_found=not_found)
+
+async def _check_update(
+    session: AsyncSession, sku_id: int, payload: SkuUpdate, version: int | None = None
+) -> Sku:
+    obj = await crud.get_by_id(session, sku_id)
+    if not obj:
+        raise HTTPException(404, "SKU not found")
+    if version is not None and obj.version != version:
+        raise HTTPException(status_code=412, detail="SKU was changed by another request, reload it and retry")
+    next_uom_id = payload.uom_id if payload.uom_id is not None else obj.uom_id
+    uom = await uom_crud.get_cached(session, next_uom_id)
+    if not uom:
+        raise HTTPException(404, "UOM not found")
+    next_code = payload.code if payload.code is not None else obj.code
+    next_description = payload.description if payload.description is not None else obj.description
+    code_exists = await crud.get_by_code(session, next_code, exclude_id=sku_id)
+    if code_exists:
+        raise HTTPException(status_code=409, detail="SKU code is already taken")
+    description_exists = await crud.get_by_description(
+        session, next_description, exclude_id=sku_id
+    )
+    if description_exists:
+        raise HTTPException(status_code=409, detail="SKU description is already taken")
+    return obj
 
 @router.put("/{sku_id}", response_model=SkuOut)
-async def update(sku_id: int, payload: SkuUpdate, session: AsyncSession = Depends(get_session)):
+async def update(
+    sku_id: int, payload: SkuUpdate, request: Request, session: AsyncSession = Depends(get_session)
+):
+    version = expected_version(request, payload.version)
     async with session.begin():
-        obj = await crud.get_by_id(session, sku_id)
-        if not obj:
-            raise HTTPException(404, "SKU not found")
-        next_uom_id = payload.uom_id if payload.uom_id is not None else obj.uom_id
-        uom = await uom_crud.get_by_id(session, next_uom_id)
-        if not uom:
-            raise HTTPException(404, "UOM not found")
-        next_code = payload.code if payload.code is not None else obj.code
-        next_description = payload.description if payload.description is not None else obj.description
-        code_exists = await crud.get_by_code(session, next_code, exclude_id=sku_id)
-        if code_exists:
-            raise HTTPException(status_code=409, detail="SKU code is already taken")
-        description_exists = await crud.get_by_description(
-            session, next_description, exclude_id=sku_id
-        )
-        if description_exists:
-            raise HTTPException(status_code=409, detail="SKU description is already taken")
-        return await crud.update(
-            session, obj, payload.code, payload.description, payload.unit_price, payload.uom_id
-        )
+        # With a version the update is a single UPDATE ... WHERE id = ? AND version = ?, no read first.
+        conditional = version is not None and session.bind.dialect.update_returning
+        if not conditional and not constraint_writes_enabled(session):
+            obj = await _check_update(session, sku_id, payload, version)
+            try:
+                return await crud.update(
+                    session, obj, payload.code, payload.description, payload.unit_price, payload.uom_id
+                )
+            except IntegrityError as exc:
+                raise _integrity_error(exc) from exc
+        changes = payload.model_dump(exclude_none=True, exclude={"version"})
+        try:
+            row = await crud.update_returning(session, sku_id, changes, version)
+        except IntegrityError as exc:
+            raise _integrity_error(exc) from exc
+        if row is None:
+            # Explains the miss (404/412/409); only runs on this path.
+            await _check_update(session, sku_id, payload, version)
+            raise HTTPException(status_code=409, detail="SKU changed concurrently, retry the request")
+        return row
 
 @router.delete("/{sku_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete(sku_id: int, session: AsyncSession = Depends(get_session)):
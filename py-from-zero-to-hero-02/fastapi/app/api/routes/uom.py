@@ -1,43 +1,144 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from pydantic import TypeAdapter
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.deps import get_session
+from app.api.etag import compute_etag, expected_version, is_not_modified, not_modified
+from app.api.serialization import encode_response, response_format
+from app.api.streaming import ndjson_response, set_next_cursor
+from app.core.config import settings
+from app.db.conflicts import constraint_writes_enabled, violated_column
+from app.models.uom import UnitOfMeasurement
 from app.schemas.uom import UomCreate, UomUpdate, UomOut
 from app.uow import uom as crud
 from app.uow import sku as sku_crud
 
 router = APIRouter(prefix="/unit-of-measurements", tags=["unit_of_measurements"])
 
+# Tables whose versions make up the ETag of read responses.
+READ_TABLES = (UnitOfMeasurement.__tablename__,)
+
+# Prebuilt serializers for FAST_SERIALIZATION (building a TypeAdapter per request is costly).
+LIST_ADAPTER = TypeAdapter(list[UomOut])
+ITEM_ADAPTER = TypeAdapter(UomOut)
+
+# Unique column -> 409 message when a write trips a constraint (WRITE_MODE=constraint).
+CONFLICT_DETAILS = {
+    "code": "UOM code is already taken",
+    "name": "UOM description is already taken",
+}
+
 @router.get("", response_model=list[UomOut])
-async def list_all(session: AsyncSession = Depends(get_session)):
-    return await crud.get_all(session)
+async def list_all(
+    request: Request,
+    response: Response,
+    limit: int | None = Query(None, ge=1, le=settings.PAGE_SIZE_MAX),
+    after: int | None = Query(None, ge=0, description="Return UOMs with id greater than this cursor"),
+    stream: bool = Query(False, description="Stream every UOM as NDJSON"),
+    session: AsyncSession = Depends(get_session),
+):
+    # Polling clients send If-None-Match: answer from the table versions without reading any rows.
+    etag = await compute_etag(session, READ_TABLES, limit, after, stream, response_format(request))
+    if is_not_modified(request, etag):
+        return not_modified(request, etag)
+    headers = {"ETag": etag}
+    if stream:
+        return ndjson_response(crud.stream_all, UomOut, after=after, headers=headers)
+    if limit is None and after is None:
+        rows = await crud.get_all(session)
+    else:
+        limit = limit or settings.PAGE_SIZE_DEFAULT
+        rows = await crud.get_page(session, limit, after)
+        set_next_cursor(headers, rows, limit)
+    if settings.FAST_SERIALIZATION:
+        return encode_response(request, LIST_ADAPTER, rows, headers)
+    response.headers.update(headers)
+    return rows
+
+@router.get("/{uom_id}", response_model=UomOut)
+async def get_one(
+    uom_id: int, request: Request, response: Response, session: AsyncSession = Depends(get_session)
+):
+    etag = await compute_etag(session, READ_TABLES, "detail", uom_id, response_format(request))
+    if is_not_modified(request, etag):
+        return not_modified(request, etag)
+    obj = await crud.get_out_by_id(session, uom_id)
+    if not obj:
+        raise HTTPException(404, "UOM not found")
+    if settings.FAST_SERIALIZATION:
+        return encode_response(request, ITEM_ADAPTER, obj, {"ETag": etag})
+    response.headers["ETag"] = etag
+    return obj
+
+async def _check_create(session: AsyncSession, payload: UomCreate) -> None:
+    code_exists = await crud.get_by_code(session, payload.code)
+    if code_exists:
+        raise HTTPException(status_code=409, detail="UOM code is already taken")
+    name_exists = await crud.get_by_name(session, payload.name)
+    if name_exists:
+        raise HTTPException(status_code=409, detail="UOM description is already taken")
+
+def _integrity_error(exc: IntegrityError) -> HTTPException:
+    detail = CONFLICT_DETAILS.get(violated_column(exc), "UOM conflicts with an existing UOM")
+    return HTTPException(status_code=409, detail=detail)
 
 @router.post("", response_model=UomOut, status_code=status.HTTP_201_CREATED)
 async def create(payload: UomCreate, session: AsyncSession = Depends(get_session)):
     async with session.begin():
-        code_exists = await crud.get_by_code(session, payload.code)
-        if code_exists:
-            raise HTTPException(status_code=409, detail="UOM code is already taken")
-        name_exists = await crud.get_by_name(session, payload.name)
-        if name_exists:
-            raise HTTPException(status_code=409, detail="UOM description is already taken")
-        return await crud.create(session, payload.name, payload.code)
+        if not constraint_writes_enabled(session):
+            await _check_create(session, payload)
+            return await crud.create(session, payload.name, payload.code)
+        try:
+            row = await crud.create_returning(session, payload.name, payload.code)
+        except IntegrityError as exc:
+            raise _integrity_error(exc) from exc
+        if row is None:
+            # ON CONFLICT DO NOTHING skipped the insert: look up which key collided.
+            await _check_create(session, payload)
+            raise HTTPException(status_code=409, detail="UOM conflicts with an existing UOM")
+        return row
+
+async def _check_update(
+    session: AsyncSession, uom_id: int, payload: UomUpdate, version: int | None = None
+) -> UnitOfMeasurement:
+    obj = await crud.get_by_id(session, uom_id)
+    if not obj:
+        raise HTTPException(404, "UOM not found")
+    if version is not None and obj.version != version:
+        raise HTTPException(status_code=412, detail="UOM was changed by another request, reload it and retry")
+    next_code = payload.code if payload.code is not None else obj.code
+    next_name = payload.name if payload.name is not None else obj.name
+    code_exists = await crud.get_by_code(session, next_code, exclude_id=uom_id)
+    if code_exists:
+        raise HTTPException(status_code=409, detail="UOM code is already taken")
+    name_exists = await crud.get_by_name(session, next_name, exclude_id=uom_id)
+    if name_exists:
+        raise HTTPException(status_code=409, detail="UOM description is already taken")
+    return obj
 
 @router.put("/{uom_id}", response_model=UomOut, status_code=status.HTTP_200_OK)
-async def update(uom_id: int, payload: UomUpdate, session: AsyncSession = Depends(get_session)):
+async def update(
+    uom_id: int, payload: UomUpdate, request: Request, session: AsyncSession = Depends(get_session)
+):
+    version = expected_version(request, payload.version)
     async with session.begin():
-        obj = await crud.get_by_id(session, uom_id)
-        if not obj:
-            raise HTTPException(404, "UOM not found")
-        next_code = payload.code if payload.code is not None else obj.code
-        next_name = payload.name if payload.name is not None else obj.name
-        code_exists = await crud.get_by_code(session, next_code, exclude_id=uom_id)
-        if code_exists:
-            raise HTTPException(status_code=409, detail="UOM code is already taken")
-        name_exists = await crud.get_by_name(session, next_name, exclude_id=uom_id)
-        if name_exists:
-            raise HTTPException(status_code=409, detail="UOM description is already taken")
-        return await crud.update(session, obj, payload.name, payload.code)
+        # With a version the update is a single UPDATE ... WHERE id = ? AND version = ?, no read first.
+        conditional = version is not None and session.bind.dialect.update_returning
+        if not conditional and not constraint_writes_enabled(session):
+            obj = await _check_update(session, uom_id, payload, version)
+            return await crud.update(session, obj, payload.name, payload.code)
+        changes = payload.model_dump(exclude_none=True, exclude={"version"})
+        try:
+            row = await crud.update_returning(session, uom_id, changes, version)
+        except IntegrityError as exc:
+            raise _integrity_error(exc) from exc
+        if row is None:
+            obj = await crud.get_by_id(session, uom_id)
+            if not obj:
+                raise HTTPException(404, "UOM not found")
+            raise HTTPException(status_code=412, detail="UOM was changed by another request, reload it and retry")
+        return row
 
 @router.delete("/{uom_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete(uom_id: int, session: AsyncSession = Depends(get_session)):
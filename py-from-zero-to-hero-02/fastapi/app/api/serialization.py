@@ -0,0 +1,95 @@
+import gzip
+from decimal import Decimal
+from typing import Any
+
+from fastapi import Request, Response
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+
+from app.core.config import settings
+
+# Optional accelerators (`uv sync --extra fast`); every feature degrades gracefully without them.
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+try:
+    import msgpack
+except ImportError:  # pragma: no cover
+    msgpack = None
+try:
+    import brotli
+except ImportError:  # pragma: no cover
+    brotli = None
+
+JSON_MEDIA_TYPE = "application/json"
+MSGPACK_MEDIA_TYPES = ("application/msgpack", "application/x-msgpack")
+
+# Encodings encode_response can apply, and the request headers its output depends on.
+ENCODINGS = ("br", "gzip")
+VARY = "Accept, Accept-Encoding"
+
+def _default(obj: Any) -> Any:
+    # Numeric(12, 2) columns come back as Decimal; the API exposes them as JSON numbers.
+    if isinstance(obj, Decimal):
+        return float(obj)
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+class ORJSONResponse(JSONResponse):
+    """JSONResponse rendered with orjson (falls back to the standard encoder when it is missing)."""
+
+    def render(self, content: Any) -> bytes:
+        if orjson is None:
+            return super().render(content)
+        return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+
+def _tokens(header: str) -> set[str]:
+    return {part.split(";")[0].strip().lower() for part in header.split(",") if part.strip()}
+
+def accepted_encodings(request: Request) -> set[str]:
+    return _tokens(request.headers.get("accept-encoding", ""))
+
+def encoded_etag(etag: str, encoding: str | None) -> str:
+    """A strong ETag identifies one exact byte sequence, so it must differ per encoding: "x" -> "x-gzip"."""
+    return etag[:-1] + f'-{encoding}"' if encoding else etag
+
+def response_format(request: Request) -> str:
+    """Representation negotiated from Accept: "msgpack" when asked for and available, else "json"."""
+    if settings.FAST_SERIALIZATION and msgpack is not None:
+        if _tokens(request.headers.get("accept", "")) & set(MSGPACK_MEDIA_TYPES):
+            return "msgpack"
+    return "json"
+
+def content_encoding(request: Request, size: int) -> str | None:
+    """Compression to apply to a body of `size` bytes, honouring Accept-Encoding and the threshold."""
+    if not settings.COMPRESS_MIN_SIZE or size < settings.COMPRESS_MIN_SIZE:
+        return None
+    accepted = accepted_encodings(request)
+    if brotli is not None and "br" in accepted:
+        return "br"
+    if "gzip" in accepted:
+        return "gzip"
+    return None
+
+def encode_response(
+    request: Request, adapter: TypeAdapter, data: Any, headers: dict[str, str] | None = None
+) -> Response:
+    """Serialize `data` once through a prebuilt TypeAdapter, skipping FastAPI's response validation."""
+    headers = dict(headers or {})
+    if response_format(request) == "msgpack":
+        body = msgpack.packb(adapter.dump_python(data, mode="json"))
+        media_type = MSGPACK_MEDIA_TYPES[0]
+    else:
+        body = adapter.dump_json(data)
+        media_type = JSON_MEDIA_TYPE
+    encoding = content_encoding(request, len(body))
+    if encoding == "br":
+        body = brotli.compress(body, quality=settings.COMPRESS_LEVEL)
+    elif encoding == "gzip":
+        body = gzip.compress(body, compresslevel=settings.COMPRESS_LEVEL)
+    if encoding:
+        headers["Content-Encoding"] = encoding
+        if "ETag" in headers:
+            headers["ETag"] = encoded_etag(headers["ETag"], encoding)
+    headers["Vary"] = VARY
+    return Response(body, media_type=media_type, headers=headers)
@@ -0,0 +1,31 @@
+from collections.abc import AsyncIterator, Callable, MutableMapping
+
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+
+from app.core.config import settings
+from app.db.session import AsyncSessionLocal
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+def set_next_cursor(headers: MutableMapping[str, str], rows: list, limit: int) -> None:
+    """Advertise the keyset cursor of the next page when the current one is full."""
+    if rows and len(rows) == limit:
+        headers[NEXT_CURSOR_HEADER] = str(rows[-1].id)
+
+def ndjson_response(
+    stream_fn: Callable[..., AsyncIterator],
+    schema: type[BaseModel],
+    after: int | None = None,
+    headers: dict[str, str] | None = None,
+) -> StreamingResponse:
+    """Stream rows as newline-delimited JSON while they are read from the database."""
+
+    async def body() -> AsyncIterator[str]:
+        # The body is consumed after the route returns, so it owns its session.
+        async with AsyncSessionLocal() as session:
+            async for obj in stream_fn(session, after=after, batch_size=settings.STREAM_BATCH_SIZE):
+                yield schema.model_validate(obj).model_dump_json() + "\n"
+
+    return StreamingResponse(body(), media_type=NDJSON_MEDIA_TYPE, headers=headers)
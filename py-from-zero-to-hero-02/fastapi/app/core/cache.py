@@ -0,0 +1,101 @@
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable, Hashable
+from typing import Generic, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+class TTLCache(Generic[K, V]):
+    """Bounded in-process LRU cache with a per-entry TTL and hit/miss counters.
+
+    Every mutation happens between two awaits, so the cache is safe to share between
+    coroutines of one event loop. Generation counters stop a loader that raced with a
+    write of its key (set/invalidate) or with clear() from storing the stale value it read;
+    loads of other keys are unaffected.
+    """
+
+    def __init__(self, max_size: int, ttl_seconds: float, clock: Callable[[], float] = time.monotonic):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._data: OrderedDict[K, tuple[float, V]] = OrderedDict()
+        self._generation = 0
+        # key -> [generation, loaders in flight]; only keys being loaded are tracked
+        self._loads: dict[K, list[int]] = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_size > 0 and self.ttl_seconds > 0
+
+    def get(self, key: K) -> V | None:
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= self._clock():
+            del self._data[key]
+            return None
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: K, value: V) -> None:
+        self._bump(key)
+        self._store(key, value)
+
+    def _store(self, key: K, value: V) -> None:
+        if not self.enabled:
+            return
+        self._data[key] = (self._clock() + self.ttl_seconds, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_size:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def _bump(self, key: K) -> None:
+        load = self._loads.get(key)
+        if load is not None:
+            load[0] += 1
+
+    def invalidate(self, key: K) -> None:
+        self._bump(key)
+        self._data.pop(key, None)
+
+    def clear(self) -> None:
+        self._generation += 1
+        self._data.clear()
+
+    async def get_or_load(self, key: K, loader: Callable[[], Awaitable[V | None]]) -> V | None:
+        """Return the cached value or await `loader` and cache its (non-None) result."""
+        value = self.get(key)
+        if value is not None:
+            self.hits += 1
+            return value
+        self.misses += 1
+        load = self._loads.setdefault(key, [0, 0])
+        load[1] += 1
+        generation = (self._generation, load[0])
+        try:
+            value = await loader()
+        finally:
+            load[1] -= 1
+            if not load[1]:
+                del self._loads[key]
+        if value is not None and generation == (self._generation, load[0]):
+            self._store(key, value)
+        return value
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "max_size": self.max_size,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
@@ -0,0 +1,77 @@
+import asyncio
+from collections.abc import Awaitable, Callable
+from typing import Generic, TypeVar
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+class WriteCoalescer(Generic[T, R]):
+    """Collects items submitted by concurrent coroutines and flushes them together.
+
+    A batch is flushed `window_seconds` after its first item arrives or as soon as it holds
+    `max_size` items. `flush` receives the items in submission order and returns one result per
+    item; a result that is an exception is raised to the coroutine that submitted that item.
+    """
+
+    def __init__(
+        self,
+        flush: Callable[[list[T]], Awaitable[list[R | Exception]]],
+        window_seconds: float,
+        max_size: int,
+    ):
+        self._flush_fn = flush
+        self.window_seconds = window_seconds
+        self.max_size = max_size
+        self._pending: list[tuple[T, asyncio.Future]] = []
+        self._timer: asyncio.TimerHandle | None = None
+        self._tasks: set[asyncio.Task] = set()
+        self.batches = 0
+        self.items = 0
+
+    async def submit(self, item: T) -> R:
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((item, future))
+        if len(self._pending) >= self.max_size:
+            self._start_flush()
+        elif self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(self.window_seconds, self._start_flush)
+        result = await future
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    def _start_flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.create_task(self._flush(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _flush(self, batch: list[tuple[T, asyncio.Future]]) -> None:
+        self.batches += 1
+        self.items += len(batch)
+        try:
+            results = await self._flush_fn([item for item, _ in batch])
+        except Exception as exc:
+            results = [exc] * len(batch)
+        for (_, future), result in zip(batch, results):
+            # The submitter may have gone away (client disconnect cancels the request task).
+            if not future.done():
+                future.set_result(result)
+
+    async def close(self) -> None:
+        """Flush what is buffered and wait for in-flight batches (call on shutdown)."""
+        self._start_flush()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def stats(self) -> dict:
+        return {
+            "batches": self.batches,
+            "items": self.items,
+            "avg_batch_size": round(self.items / self.batches, 2) if self.batches else 0.0,
+            "pending": len(self._pending),
+        }
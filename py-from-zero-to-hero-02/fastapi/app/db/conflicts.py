@@ -0,0 +1,42 @@
+import re
+
+from sqlalchemy import Insert, insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+
+# Postgres: 'DETAIL:  Key (code)=(KG) already exists.' / 'Key (uom_id)=(9) is not present in table ...'
+_PG_KEY = re.compile(r"Key \((\w+)\)=")
+# SQLite: 'UNIQUE constraint failed: skus.code'
+_SQLITE_UNIQUE = re.compile(r"UNIQUE constraint failed: \w+\.(\w+)")
+# Returned when the driver reports a foreign-key violation without naming the column (SQLite).
+FOREIGN_KEY = "<foreign key>"
+
+def constraint_writes_enabled(session: AsyncSession) -> bool:
+    """True when writes should rely on DB constraints and RETURNING instead of pre-checks."""
+    dialect = session.bind.dialect
+    return settings.WRITE_MODE == "constraint" and dialect.insert_returning and dialect.update_returning
+
+def insert_on_conflict_do_nothing(session: AsyncSession, model) -> Insert:
+    """INSERT that skips unique conflicts (ON CONFLICT DO NOTHING) on dialects that support it."""
+    dialect_name = session.bind.dialect.name
+    if dialect_name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+        return pg_insert(model).on_conflict_do_nothing()
+    if dialect_name == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+        return sqlite_insert(model).on_conflict_do_nothing()
+    return insert(model)
+
+def violated_column(exc: IntegrityError) -> str | None:
+    """Best-effort name of the column behind a unique or foreign-key violation."""
+    message = str(exc.orig)
+    match = _PG_KEY.search(message) or _SQLITE_UNIQUE.search(message)
+    if match:
+        return match.group(1)
+    if "foreign key" in message.lower():
+        return FOREIGN_KEY
+    return None
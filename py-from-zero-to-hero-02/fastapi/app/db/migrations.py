@@ -0,0 +1,130 @@
+"""Schema versioning: a cheap check at startup, creation/upgrades as an explicit step.
+
+    uv run python -m app.db.migrations upgrade   # create or upgrade the schema
+    uv run python -m app.db.migrations check     # exit code 1 when an upgrade is pending
+"""
+import argparse
+import asyncio
+from collections.abc import Callable
+
+from sqlalchemy import Connection, delete, func, insert, inspect, select, text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.db.base import Base
+from app.models import SchemaVersion, Sku, UnitOfMeasurement
+from app.models.sku import SQLITE_FTS_UPDATE_TRIGGER, create_search_structures
+
+# Bump together with a new MIGRATIONS entry whenever the models change.
+SCHEMA_VERSION = 6
+
+def _add_version_columns(conn: Connection) -> None:
+    # Optimistic concurrency counters (If-Match / version on PUT).
+    for table in (Sku.__tablename__, UnitOfMeasurement.__tablename__):
+        conn.execute(text(f"ALTER TABLE {table} ADD COLUMN version INTEGER NOT NULL DEFAULT 1"))
+
+def _add_price_stats_index(conn: Connection) -> None:
+    # Covering index for GET /skus/stats.
+    conn.execute(text("CREATE INDEX IF NOT EXISTS ix_skus_uom_id_unit_price ON skus (uom_id, unit_price)"))
+
+def _add_search_structures(conn: Connection) -> None:
+    # GET /skus/search: FTS5 table + sync triggers (SQLite, backfilled with 'rebuild'),
+    # pg_trgm + prefix/trigram indexes (Postgres). Idempotent, like create_all on a new database.
+    create_search_structures(conn)
+
+def _add_description_unique(conn: Connection) -> None:
+    # skus.description became unique after the first databases were created; WRITE_MODE=constraint relies on it.
+    inspector = inspect(conn)
+    table = Sku.__tablename__
+    unique_columns = [c["column_names"] for c in inspector.get_unique_constraints(table)]
+    unique_columns += [i["column_names"] for i in inspector.get_indexes(table) if i["unique"]]
+    if ["description"] in unique_columns:
+        return
+    duplicated = conn.execute(
+        select(Sku.description).group_by(Sku.description).having(func.count() > 1).limit(5)
+    ).scalars().all()
+    if duplicated:
+        raise RuntimeError(f"Cannot make skus.description unique, duplicated values: {duplicated}")
+    if conn.dialect.name == "sqlite":
+        # SQLite cannot add a constraint to an existing table; a unique index enforces the same rule.
+        conn.execute(text(f"CREATE UNIQUE INDEX uq_skus_description ON {table} (description)"))
+    else:
+        conn.execute(text(f"ALTER TABLE {table} ADD CONSTRAINT skus_description_key UNIQUE (description)"))
+
+def _narrow_fts_update_trigger(conn: Connection) -> None:
+    # Databases upgraded to 4 got an FTS trigger firing on every UPDATE (prices, versions); replace it.
+    if conn.dialect.name == "sqlite":
+        conn.execute(text("DROP TRIGGER IF EXISTS skus_fts_au"))
+        conn.exec_driver_sql(SQLITE_FTS_UPDATE_TRIGGER)
+
+# version -> step that moves a database from version - 1 to version (run before create_all adds new tables).
+MIGRATIONS: dict[int, Callable[[Connection], None]] = {
+    2: _add_version_columns,
+    3: _add_price_stats_index,
+    4: _add_search_structures,
+    5: _add_description_unique,
+    6: _narrow_fts_update_trigger,
+}
+
+class SchemaVersionError(RuntimeError):
+    """The database schema does not match the version this code expects."""
+
+async def get_schema_version(engine: AsyncEngine) -> int | None:
+    """Applied schema version, or None when the database was never stamped."""
+    try:
+        async with engine.connect() as conn:
+            res = await conn.execute(select(SchemaVersion.version))
+            return res.scalar_one_or_none()
+    except DBAPIError:
+        # No schema_version table yet.
+        return None
+
+async def check_schema(engine: AsyncEngine) -> None:
+    """One SELECT at startup instead of reflecting every table with create_all."""
+    version = await get_schema_version(engine)
+    if version != SCHEMA_VERSION:
+        raise SchemaVersionError(
+            f"Database schema version is {version}, expected {SCHEMA_VERSION}: "
+            "run `python -m app.db.migrations upgrade`"
+        )
+
+def _upgrade(conn: Connection) -> tuple[int | None, int]:
+    version = None
+    inspector = inspect(conn)
+    if inspector.has_table(SchemaVersion.__tablename__):
+        version = conn.execute(select(SchemaVersion.version)).scalar_one_or_none()
+    elif inspector.has_table(Sku.__tablename__):
+        # Tables created by create_all before schema versioning existed: the version 1 baseline.
+        version = 1
+    if version is not None:
+        for step in range(version + 1, SCHEMA_VERSION + 1):
+            MIGRATIONS[step](conn)
+    # Creates a fresh schema, or the tables added since `version` (existing tables are left alone).
+    Base.metadata.create_all(conn)
+    conn.execute(delete(SchemaVersion))
+    conn.execute(insert(SchemaVersion).values(version=SCHEMA_VERSION))
+    return version, SCHEMA_VERSION
+
+async def upgrade(engine: AsyncEngine) -> tuple[int | None, int]:
+    """Create or upgrade the schema in one transaction; returns (previous, current) versions."""
+    async with engine.begin() as conn:
+        return await conn.run_sync(_upgrade)
+
+async def _main(command: str) -> int:
+    from app.db.session import engine
+
+    try:
+        if command == "upgrade":
+            previous, current = await upgrade(engine)
+            print(f"Schema upgraded from version {previous} to {current}")
+            return 0
+        version = await get_schema_version(engine)
+        print(f"Schema version {version}, expected {SCHEMA_VERSION}")
+        return 0 if version == SCHEMA_VERSION else 1
+    finally:
+        await engine.dispose()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("command", choices=["upgrade", "check"])
+    raise SystemExit(asyncio.run(_main(parser.parse_args().command)))
@@ -0,0 +1,74 @@
+import bisect
+import time
+
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+# Upper bounds (seconds) of the checkout wait-time histogram buckets; the last bucket is +Inf.
+WAIT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+class PoolMetrics:
+    """Counters and a wait-time histogram for connection checkouts (per worker process)."""
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self) -> None:
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_seconds_sum = 0.0
+        self.wait_seconds_max = 0.0
+        self.wait_buckets = [0] * (len(WAIT_BUCKETS) + 1)
+
+    def observe_wait(self, seconds: float, timed_out: bool = False) -> None:
+        if timed_out:
+            self.timeouts += 1
+        else:
+            self.checkouts += 1
+        self.wait_seconds_sum += seconds
+        self.wait_seconds_max = max(self.wait_seconds_max, seconds)
+        self.wait_buckets[bisect.bisect_left(WAIT_BUCKETS, seconds)] += 1
+
+    def histogram(self) -> dict[str, int]:
+        # Cumulative counts, Prometheus style ("le" = less than or equal).
+        cumulative, total = {}, 0
+        for bound, count in zip([*map(str, WAIT_BUCKETS), "+Inf"], self.wait_buckets):
+            total += count
+            cumulative[bound] = total
+        return cumulative
+
+pool_metrics = PoolMetrics()
+
+class InstrumentedAsyncQueuePool(AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool that records how long each checkout waited for a connection."""
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            conn = super()._do_get()
+        except PoolTimeoutError:
+            pool_metrics.observe_wait(time.perf_counter() - started, timed_out=True)
+            raise
+        pool_metrics.observe_wait(time.perf_counter() - started)
+        return conn
+
+def pool_status(pool) -> dict:
+    """Live pool occupancy plus the checkout wait telemetry collected so far."""
+    status = {"pool_class": type(pool).__name__}
+    if isinstance(pool, AsyncAdaptedQueuePool):
+        status.update(
+            size=pool.size(),
+            checked_out=pool.checkedout(),
+            idle=pool.checkedin(),
+            overflow=max(pool.overflow(), 0),
+            timeout_seconds=pool.timeout(),
+        )
+    waits = pool_metrics.checkouts + pool_metrics.timeouts
+    status.update(
+        checkouts=pool_metrics.checkouts,
+        timeouts=pool_metrics.timeouts,
+        wait_seconds_avg=pool_metrics.wait_seconds_sum / waits if waits else 0.0,
+        wait_seconds_max=pool_metrics.wait_seconds_max,
+        wait_seconds_histogram=pool_metrics.histogram(),
+    )
+    return status
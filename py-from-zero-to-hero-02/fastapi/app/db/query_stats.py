@@ -0,0 +1,105 @@
+import logging
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class QueryStats:
+    """SQL statements executed while serving one request."""
+
+    count: int = 0
+    total_seconds: float = 0.0
+    slowest_seconds: float = 0.0
+    slowest_statement: str | None = None
+
+    def record(self, statement: str, seconds: float) -> None:
+        self.count += 1
+        self.total_seconds += seconds
+        if seconds > self.slowest_seconds:
+            self.slowest_seconds = seconds
+            self.slowest_statement = statement
+
+# Stats of the request being served; SQLAlchemy's async greenlets run in the caller's context.
+current_stats: ContextVar[QueryStats | None] = ContextVar("current_query_stats", default=None)
+
+@dataclass
+class RouteStats:
+    """Aggregated query statistics of one route."""
+
+    requests: int = 0
+    queries: int = 0
+    max_queries: int = 0
+    db_seconds: float = 0.0
+    slowest_seconds: float = 0.0
+    slowest_statement: str | None = None
+
+    def add(self, stats: QueryStats) -> None:
+        self.requests += 1
+        self.queries += stats.count
+        self.max_queries = max(self.max_queries, stats.count)
+        self.db_seconds += stats.total_seconds
+        if stats.slowest_seconds > self.slowest_seconds:
+            self.slowest_seconds = stats.slowest_seconds
+            self.slowest_statement = stats.slowest_statement
+
+    def as_dict(self) -> dict:
+        return {
+            "requests": self.requests,
+            "queries": self.queries,
+            "avg_queries": round(self.queries / self.requests, 2) if self.requests else 0.0,
+            "max_queries": self.max_queries,
+            "avg_db_ms": round(self.db_seconds * 1000 / self.requests, 3) if self.requests else 0.0,
+            "slowest_ms": round(self.slowest_seconds * 1000, 3),
+            "slowest_statement": self.slowest_statement,
+        }
+
+class QueryMetrics:
+    """Per-route totals since startup (per worker process)."""
+
+    def __init__(self):
+        self.routes: dict[str, RouteStats] = {}
+        self.slow_queries = 0
+
+    def add(self, route: str, stats: QueryStats) -> None:
+        self.routes.setdefault(route, RouteStats()).add(stats)
+
+    def snapshot(self) -> dict:
+        return {
+            "slow_queries": self.slow_queries,
+            "routes": {route: stats.as_dict() for route, stats in sorted(self.routes.items())},
+        }
+
+    def reset(self) -> None:
+        self.routes.clear()
+        self.slow_queries = 0
+
+query_metrics = QueryMetrics()
+
+def install_query_hooks(engine: Engine, slow_query_seconds: float) -> None:
+    """Time every cursor execution and log the ones slower than `slow_query_seconds` (<= 0 disables)."""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _start(conn, cursor, statement, parameters, context, executemany) -> None:
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _stop(conn, cursor, statement, parameters, context, executemany) -> None:
+        seconds = time.perf_counter() - conn.info["query_start"].pop()
+        stats = current_stats.get()
+        if stats is not None:
+            stats.record(statement, seconds)
+        if 0 < slow_query_seconds <= seconds:
+            query_metrics.slow_queries += 1
+            logger.warning("Slow query (%.1f ms): %s | params=%r", seconds * 1000, statement, parameters)
+
+    @event.listens_for(engine, "handle_error")
+    def _discard(exception_context) -> None:
+        # A failed statement never reaches after_cursor_execute.
+        conn = exception_context.connection
+        if conn is not None and conn.info.get("query_start"):
+            conn.info["query_start"].pop()
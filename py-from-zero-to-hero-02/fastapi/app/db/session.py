@@ -1,8 +1,37 @@
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 
 from app.core.config import settings
+from app.db.pool import InstrumentedAsyncQueuePool
+from app.db.query_stats import install_query_hooks
 
-engine = create_async_engine(settings.DATABASE_URL, echo=False, future=True)
+def _engine_options(database_url: str) -> dict:
+    url = make_url(database_url)
+    if url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:"):
+        # In-memory SQLite lives in a single connection (StaticPool): no pool to tune.
+        return {}
+    options = {
+        "poolclass": InstrumentedAsyncQueuePool,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+    }
+    if url.get_driver_name() == "asyncpg":
+        # SQLAlchemy's prepared statement cache and asyncpg's own statement cache;
+        # set DB_STATEMENT_CACHE_SIZE=0 behind pgbouncer in transaction mode.
+        options["connect_args"] = {
+            "prepared_statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+            "statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+        }
+    return options
+
+engine = create_async_engine(settings.DATABASE_URL, echo=False, future=True, **_engine_options(settings.DATABASE_URL))
+
+if settings.QUERY_STATS_ENABLED:
+    # Query count, DB time and slow-statement logging per request (see app/api/query_stats.py).
+    install_query_hooks(engine.sync_engine, settings.SLOW_QUERY_MS / 1000)
 
 AsyncSessionLocal = async_sessionmaker(
     # connects the session to the db engine
@@ -1,23 +1,33 @@
 from contextlib import asynccontextmanager
 from importlib import import_module
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+from sqlalchemy.orm.exc import StaleDataError
+from app.api.query_stats import QueryStatsMiddleware
+from app.core.config import settings
+from app.db.migrations import check_schema
 from app.db.session import engine
-from app.db.base import Base
 
 # Ensure SQLAlchemy model mappers are registered at startup.
 import_module("app.models")
 
 from app.api.routes.uom import router as uom_router
-from app.api.routes.sku import router as sku_router
+from app.api.routes.sku import create_coalescer, router as sku_router
+from app.api.routes.internal import router as internal_router
+from app.uow import uom as uom_crud
 
 @asynccontextmanager
 async def lifespan(_app: FastAPI):
     _ = _app  # FastAPI passes the app instance; keep explicit to satisfy Pylance.
-    # =>>>> For production: lets use "Alembic migrations" instead of "create_all".
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
+    # The schema is created/upgraded by `python -m app.db.migrations upgrade`; workers only check its version.
+    await check_schema(engine)
+    # Keeps the UOM cache coherent across workers when UOM_CACHE_BROADCAST is enabled.
+    uom_listener = await uom_crud.listen_for_cache_invalidations(engine)
     yield
+    await create_coalescer.close()
+    if uom_listener is not None:
+        await uom_listener.close()
 
 
 app = FastAPI(
@@ -25,5 +35,14 @@ app = FastAPI(
     lifespan=lifespan,
 )
 
+@app.exception_handler(StaleDataError)
+async def stale_data_handler(_request: Request, _exc: StaleDataError):
+    # An ORM flush found the row at another version (version_id_col): a concurrent write won.
+    return JSONResponse(status_code=409, content={"detail": "Resource changed concurrently, retry the request"})
+
+if settings.QUERY_STATS_ENABLED:
+    app.add_middleware(QueryStatsMiddleware)
+
 app.include_router(uom_router)
 app.include_router(sku_router)
+app.include_router(internal_router)
@@ -3,6 +3,8 @@
 # relationship resolution (e.g., "Sku" <-> "UnitOfMeasurement").
 from app.models.sku import Sku
 from app.models.uom import UnitOfMeasurement
+from app.models.table_version import TableVersion
+from app.models.schema_version import SchemaVersion
 
 # Re-export model classes used by the application bootstrap.
-__all__ = ["Sku", "UnitOfMeasurement"]
+__all__ = ["Sku", "UnitOfMeasurement", "TableVersion", "SchemaVersion"]
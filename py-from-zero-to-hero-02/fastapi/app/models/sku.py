@@ -1,4 +1,4 @@
-from sqlalchemy import String, Numeric, ForeignKey
+from sqlalchemy import DDL, Connection, Integer, String, Numeric, ForeignKey, Index, event, func
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.db.base import Base
@@ -10,10 +10,86 @@ class Sku(Base):
 
     id: Mapped[int] = mapped_column(primary_key=True)
     code: Mapped[str] = mapped_column(String(40), nullable=False, unique=True)
-    description: Mapped[str] = mapped_column(String(255), nullable=False)
+    description: Mapped[str] = mapped_column(String(255), nullable=False, unique=True)
     unit_price: Mapped[float] = mapped_column(Numeric(12, 2), nullable=False)
+    # Optimistic concurrency: bumped by every update, compared by conditional updates (If-Match).
+    version: Mapped[int] = mapped_column(Integer, nullable=False, default=1, server_default="1")
 
     # FK to unit_of_measurements.id
     uom_id: Mapped[int] = mapped_column(ForeignKey("unit_of_measurements.id"), nullable=False)
-    # Eager-load the related UOM in list/read operations.
-    uom = relationship("UnitOfMeasurement", back_populates="skus", lazy="selectin") 
+    # No model-level eager loading: queries that need the UOM join it or add a loader option.
+    uom = relationship("UnitOfMeasurement", back_populates="skus", lazy="raise")
+
+    __mapper_args__ = {"version_id_col": version}
+
+# Covering index for GET /skus/stats (aggregates per UOM read from the index alone).
+Index("ix_skus_uom_id_unit_price", Sku.uom_id, Sku.unit_price)
+
+# Search structures (GET /skus/search), created with the table and by migration 4 on existing databases.
+# Postgres: btree on lower(code) for prefix LIKE, trigram GIN on description for substring/similarity.
+SEARCH_INDEXES = (
+    Index(
+        "ix_skus_code_lower_prefix",
+        func.lower(Sku.code).label("code_lower"),
+        postgresql_ops={"code_lower": "text_pattern_ops"},
+    ).ddl_if(dialect="postgresql"),
+    Index(
+        "ix_skus_description_trgm",
+        Sku.description,
+        postgresql_using="gin",
+        postgresql_ops={"description": "gin_trgm_ops"},
+    ).ddl_if(dialect="postgresql"),
+)
+
+PG_TRGM_DDL = "CREATE EXTENSION IF NOT EXISTS pg_trgm"
+
+event.listen(Sku.__table__, "before_create", DDL(PG_TRGM_DDL).execute_if(dialect="postgresql"))
+
+# SQLite: external-content FTS5 table over code/description, kept in sync by triggers.
+SQLITE_FTS_TABLE = "skus_fts"
+
+# Only code/description are indexed: price updates and version bumps leave the FTS row alone.
+SQLITE_FTS_UPDATE_TRIGGER = (
+    f"CREATE TRIGGER IF NOT EXISTS skus_fts_au AFTER UPDATE OF code, description ON skus BEGIN "
+    f"INSERT INTO {SQLITE_FTS_TABLE}({SQLITE_FTS_TABLE}, rowid, code, description) "
+    "VALUES ('delete', old.id, old.code, old.description); "
+    f"INSERT INTO {SQLITE_FTS_TABLE}(rowid, code, description) VALUES (new.id, new.code, new.description); END"
+)
+
+SQLITE_FTS_DDL = (
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {SQLITE_FTS_TABLE} USING fts5("
+    "code, description, content='skus', content_rowid='id', prefix='2 3')",
+    f"CREATE TRIGGER IF NOT EXISTS skus_fts_ai AFTER INSERT ON skus BEGIN "
+    f"INSERT INTO {SQLITE_FTS_TABLE}(rowid, code, description) VALUES (new.id, new.code, new.description); END",
+    f"CREATE TRIGGER IF NOT EXISTS skus_fts_ad AFTER DELETE ON skus BEGIN "
+    f"INSERT INTO {SQLITE_FTS_TABLE}({SQLITE_FTS_TABLE}, rowid, code, description) "
+    "VALUES ('delete', old.id, old.code, old.description); END",
+    SQLITE_FTS_UPDATE_TRIGGER,
+    # Index the rows already in `skus` (no-op on a new table).
+    f"INSERT INTO {SQLITE_FTS_TABLE}({SQLITE_FTS_TABLE}) VALUES ('rebuild')",
+)
+
+def create_sqlite_fts(conn: Connection) -> None:
+    """Create the FTS table and its triggers if missing, then (re)index the existing rows."""
+    for statement in SQLITE_FTS_DDL:
+        conn.exec_driver_sql(statement)
+
+def create_search_structures(conn: Connection) -> None:
+    """Idempotently create the search structures of the connection's dialect on an existing `skus` table."""
+    if conn.dialect.name == "postgresql":
+        conn.exec_driver_sql(PG_TRGM_DDL)
+        for index in SEARCH_INDEXES:
+            index.create(conn, checkfirst=True)
+    elif conn.dialect.name == "sqlite":
+        create_sqlite_fts(conn)
+
+@event.listens_for(Sku.__table__, "after_create")
+def _create_sqlite_fts(target, connection: Connection, **kw) -> None:
+    if connection.dialect.name == "sqlite":
+        create_sqlite_fts(connection)
+
+event.listen(
+    Sku.__table__,
+    "before_drop",
+    DDL(f"DROP TABLE IF EXISTS {SQLITE_FTS_TABLE}").execute_if(dialect="sqlite"),
+)
@@ -1,4 +1,4 @@
-from sqlalchemy import String
+from sqlalchemy import Integer, String
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.db.base import Base
@@ -11,6 +11,11 @@ class UnitOfMeasurement(Base):
     id: Mapped[int] = mapped_column(primary_key=True)
     code: Mapped[str] = mapped_column(String(20), nullable=False, unique=True)
     name: Mapped[str] = mapped_column(String(60), nullable=False, unique=True)    
+    # Optimistic concurrency: bumped by every update, compared by conditional updates (If-Match).
+    version: Mapped[int] = mapped_column(Integer, nullable=False, default=1, server_default="1")
+
+    __mapper_args__ = {"version_id_col": version}
 
     # Reverse relationship to all SKUs using this UOM.
-    skus = relationship("Sku", back_populates="uom", lazy="selectin")
+    # Never loaded implicitly; UOMs in use cannot be deleted, so deletes skip the collection too.
+    skus = relationship("Sku", back_populates="uom", lazy="raise", passive_deletes=True)
@@ -1,6 +1,18 @@
-from pydantic import BaseModel
+from decimal import ROUND_HALF_UP, Decimal
+
+from pydantic import BaseModel, Field, field_validator, model_validator
 from app.schemas.uom import UomOut
 
+# Largest value that fits skus.unit_price (Numeric(12, 2)).
+MAX_UNIT_PRICE = Decimal("9999999999.99")
+
+def to_unit_price(value: Decimal) -> Decimal:
+    """Round to cents (half up) and check it fits Numeric(12, 2), as the column would."""
+    value = value.quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
+    if abs(value) > MAX_UNIT_PRICE:
+        raise ValueError("unit_price does not fit Numeric(12, 2)")
+    return value
+
 class SkuCreate(BaseModel):
     """Payload for creating a SKU."""
 
@@ -16,6 +28,8 @@ class SkuUpdate(BaseModel):
     description: str | None = None
     unit_price: float | None = None
     uom_id: int | None = None
+    # Version the client last read; the update fails with 412 if the SKU changed since (same as If-Match).
+    version: int | None = None
 
 class SkuOut(BaseModel):
     """Default SKU response used by write endpoints."""
@@ -25,6 +39,7 @@ class SkuOut(BaseModel):
     description: str
     unit_price: float
     uom_id: int
+    version: int
 
     #  it enables response_model to serialize SQLAlchemy entities directly.
     model_config = {"from_attributes": True}
@@ -37,7 +52,67 @@ class SkuGetOut(BaseModel):
     code: str
     description: str
     unit_price: float
+    version: int
     uom: UomOut
 
     #  it enables response_model to serialize SQLAlchemy entities directly.
     model_config = {"from_attributes": True}
+
+
+class SkuBulkError(BaseModel):
+    """Rejected row of a bulk SKU import (1-based row number)."""
+
+    row: int
+    code: str | None = None
+    detail: str
+
+
+class SkuBulkOut(BaseModel):
+    """Result of a bulk SKU import."""
+
+    created: int
+    errors: list[SkuBulkError]
+
+
+class SkuPriceStats(BaseModel):
+    """unit_price statistics of the SKUs of one UOM."""
+
+    uom_id: int
+    count: int
+    min: float
+    max: float
+    avg: float
+    sum: float
+
+
+class SkuPriceItem(BaseModel):
+    """New price for one SKU, addressed by `id` or `code`."""
+
+    id: int | None = None
+    code: str | None = None
+    unit_price: Decimal
+
+    @field_validator("unit_price")
+    @classmethod
+    def _round_price(cls, value: Decimal) -> Decimal:
+        return to_unit_price(value)
+
+    @model_validator(mode="after")
+    def _one_key(self):
+        if (self.id is None) == (self.code is None):
+            raise ValueError("Provide exactly one of id or code")
+        return self
+
+
+class SkuPriceRule(BaseModel):
+    """Percentage change applied to every SKU (optionally only those of one UOM)."""
+
+    percent: Decimal = Field(gt=-100, le=1000)
+    uom_id: int | None = None
+
+
+class SkuPriceUpdateOut(BaseModel):
+    """Result of a bulk price update."""
+
+    updated: int
+    not_found: list[int | str] = []
@@ -11,6 +11,8 @@ class UomUpdate(BaseModel):
 
     code: str | None = None
     name: str | None = None    
+    # Version the client last read; the update fails with 412 if the UOM changed since (same as If-Match).
+    version: int | None = None
 
 class UomOut(BaseModel):
     """Unit-of-measurement response schema."""
@@ -18,5 +20,6 @@ class UomOut(BaseModel):
     id: int
     code: str
     name: str    
+    version: int
 
     model_config = {"from_attributes": True}
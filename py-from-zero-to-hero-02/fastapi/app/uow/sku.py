@@ -1,11 +1,182 @@
-from sqlalchemy import select
+import logging
+import re
+from collections.abc import AsyncIterator
+from decimal import Decimal
+
+from sqlalchemy import (
+    ColumnElement, Float, Numeric, Row, Select, and_, case, cast, column, exists, func, insert, literal, literal_column,
+    or_, select, table, text, update as sql_update, values,
+)
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.models.sku import Sku
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.db.conflicts import insert_on_conflict_do_nothing
+from app.uow.versions import mark_changed
+from app.models.sku import SQLITE_FTS_TABLE, Sku
+from app.models.uom import UnitOfMeasurement
+from app.schemas.sku import MAX_UNIT_PRICE, SkuGetOut, SkuPriceStats
+from app.schemas.uom import UomOut
+
+logger = logging.getLogger(__name__)
+
+# Read path for list responses: project only the columns SkuGetOut needs and join the UOM,
+# instead of hydrating Sku entities and loading their relationship.
+_READ_COLUMNS = (
+    Sku.id,
+    Sku.code,
+    Sku.description,
+    Sku.unit_price,
+    Sku.version,
+    UnitOfMeasurement.id.label("uom_id"),
+    UnitOfMeasurement.code.label("uom_code"),
+    UnitOfMeasurement.name.label("uom_name"),
+    UnitOfMeasurement.version.label("uom_version"),
+)
+
+def _read_stmt(after: int | None = None) -> Select:
+    stmt = select(*_READ_COLUMNS).join(UnitOfMeasurement, Sku.uom_id == UnitOfMeasurement.id).order_by(Sku.id)
+    if after is not None:
+        stmt = stmt.where(Sku.id > after)
+    return stmt
+
+def _to_out(row: Row) -> SkuGetOut:
+    return SkuGetOut(
+        id=row.id,
+        code=row.code,
+        description=row.description,
+        unit_price=row.unit_price,
+        version=row.version,
+        uom=UomOut(id=row.uom_id, code=row.uom_code, name=row.uom_name, version=row.uom_version),
+    )
+
+async def get_all(session: AsyncSession) -> list[SkuGetOut]:
+    res = await session.execute(_read_stmt())
+    return [_to_out(row) for row in res]
+
+async def get_page(session: AsyncSession, limit: int, after: int | None = None) -> list[SkuGetOut]:
+    # Keyset pagination: seek past the last seen id instead of using OFFSET.
+    res = await session.execute(_read_stmt(after).limit(limit))
+    return [_to_out(row) for row in res]
+
+async def get_out_by_id(session: AsyncSession, sku_id: int) -> SkuGetOut | None:
+    res = await session.execute(_read_stmt().where(Sku.id == sku_id))
+    row = res.one_or_none()
+    return _to_out(row) if row else None
+
+async def stream_all(
+    session: AsyncSession, after: int | None = None, batch_size: int = 500
+) -> AsyncIterator[SkuGetOut]:
+    # yield_per fetches rows in batches from a server-side cursor, so memory stays flat.
+    res = await session.stream(_read_stmt(after).execution_options(yield_per=batch_size))
+    async for row in res:
+        yield _to_out(row)
+
+# Price statistics keyed by the request ETag, which includes the skus table version:
+# a committed SKU write changes the key, so cached summaries never outlive the data they describe.
+stats_cache: TTLCache[str, list[SkuPriceStats]] = TTLCache(
+    settings.SKU_STATS_CACHE_MAX_SIZE, settings.SKU_STATS_CACHE_TTL_SECONDS
+)
+
+async def get_price_stats(
+    session: AsyncSession,
+    uom_ids: list[int] | None = None,
+    min_price: float | None = None,
+    max_price: float | None = None,
+) -> list[SkuPriceStats]:
+    # GROUP BY uom_id over the (uom_id, unit_price) index: no table rows are read or returned.
+    stmt = select(
+        Sku.uom_id,
+        func.count().label("count"),
+        func.min(Sku.unit_price).label("min"),
+        func.max(Sku.unit_price).label("max"),
+        func.avg(Sku.unit_price).label("avg"),
+        func.sum(Sku.unit_price).label("sum"),
+    ).group_by(Sku.uom_id).order_by(Sku.uom_id)
+    if uom_ids:
+        stmt = stmt.where(Sku.uom_id.in_(uom_ids))
+    if min_price is not None:
+        stmt = stmt.where(Sku.unit_price >= min_price)
+    if max_price is not None:
+        stmt = stmt.where(Sku.unit_price <= max_price)
+    res = await session.execute(stmt)
+    return [SkuPriceStats.model_validate(row, from_attributes=True) for row in res]
+
+# Search ranking: exact code > code prefix > description match, then text relevance.
+_EXACT_CODE_SCORE = 2000
+_CODE_PREFIX_SCORE = 1000
+_SEARCH_TOKEN = re.compile(r"\w+")
+
+def _escape_like(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+# Dialects whose search structures were found; once created they stay, so they are looked up only until then.
+_search_structures_found: set[str] = set()
+_search_fallback_logged: set[str] = set()
 
-async def get_all(session: AsyncSession) -> list[Sku]:
-    res = await session.execute(select(Sku).order_by(Sku.id))
-    return list(res.scalars().all())
+async def _has_search_structures(session: AsyncSession) -> bool:
+    """Whether the FTS table (SQLite) / pg_trgm (Postgres) exist, i.e. migration 4 has run."""
+    dialect_name = session.bind.dialect.name
+    if dialect_name in _search_structures_found:
+        return True
+    if dialect_name == "sqlite":
+        stmt = text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name").bindparams(
+            name=SQLITE_FTS_TABLE
+        )
+    elif dialect_name == "postgresql":
+        stmt = text("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+    else:
+        return True
+    if (await session.execute(stmt)).first() is None:
+        if dialect_name not in _search_fallback_logged:
+            _search_fallback_logged.add(dialect_name)
+            logger.warning("SKU search structures are missing, using unranked LIKE search: run the migrations")
+        return False
+    _search_structures_found.add(dialect_name)
+    return True
+
+def _search_stmt(dialect_name: str, q: str, indexed: bool = True) -> tuple[Select, ColumnElement[float]] | None:
+    code_lower = func.lower(Sku.code)
+    code_prefix = code_lower.like(_escape_like(q.lower()) + "%", escape="\\")
+    tier = case(
+        (code_lower == q.lower(), _EXACT_CODE_SCORE),
+        (code_prefix, _CODE_PREFIX_SCORE),
+        else_=0,
+    )
+    stmt = select(*_READ_COLUMNS).join(UnitOfMeasurement, Sku.uom_id == UnitOfMeasurement.id)
+    if dialect_name == "sqlite" and indexed:
+        # FTS5 prefix query over code and description ("abc 12" -> "abc"* "12"*), ranked by bm25.
+        tokens = _SEARCH_TOKEN.findall(q)
+        if not tokens:
+            return None
+        fts = table(SQLITE_FTS_TABLE, column("rowid"))
+        fts_column = literal_column(SQLITE_FTS_TABLE)
+        match = " ".join(f'"{token}"*' for token in tokens)
+        relevance = -func.bm25(fts_column, 10.0, 1.0)
+        stmt = stmt.join(fts, fts.c.rowid == Sku.id).where(fts_column.op("MATCH")(match))
+    else:
+        # Postgres serves lower(code) LIKE 'q%' and description ILIKE '%q%' from the search indexes.
+        # Without them (database not migrated yet) this is a plain scan ranked by the code tiers only.
+        ranked = dialect_name == "postgresql" and indexed
+        relevance = func.similarity(Sku.description, q) if ranked else literal(0.0)
+        contains = Sku.description.ilike("%" + _escape_like(q) + "%", escape="\\")
+        stmt = stmt.where(or_(code_prefix, contains))
+    return stmt, cast(tier + relevance, Float)
+
+async def search(
+    session: AsyncSession, q: str, limit: int, after: tuple[float, int] | None = None
+) -> list[tuple[SkuGetOut, float]]:
+    """Ranked SKU search; keyset-paginated on (score desc, id) via `after`."""
+    built = _search_stmt(session.bind.dialect.name, q, await _has_search_structures(session))
+    if built is None:
+        return []
+    stmt, score = built
+    if after is not None:
+        after_score, after_id = after
+        stmt = stmt.where(or_(score < after_score, and_(score == after_score, Sku.id > after_id)))
+    stmt = stmt.add_columns(score.label("score")).order_by(score.desc(), Sku.id).limit(limit)
+    res = await session.execute(stmt)
+    return [(_to_out(row), row.score) for row in res]
 
 async def get_by_id(session: AsyncSession, sku_id: int) -> Sku | None:
     return await session.get(Sku, sku_id)
@@ -26,6 +197,23 @@ async def get_by_description(
     res = await session.execute(stmt.limit(1))
     return res.scalar_one_or_none()
 
+async def get_existing_codes(session: AsyncSession, codes: list[str], chunk_size: int = 1000) -> set[str]:
+    found: set[str] = set()
+    for start in range(0, len(codes), chunk_size):
+        res = await session.execute(select(Sku.code).where(Sku.code.in_(codes[start:start + chunk_size])))
+        found.update(res.scalars().all())
+    return found
+
+async def get_existing_descriptions(
+    session: AsyncSession, descriptions: list[str], chunk_size: int = 1000
+) -> set[str]:
+    found: set[str] = set()
+    for start in range(0, len(descriptions), chunk_size):
+        chunk = descriptions[start:start + chunk_size]
+        res = await session.execute(select(Sku.description).where(Sku.description.in_(chunk)))
+        found.update(res.scalars().all())
+    return found
+
 async def has_any_for_uom(session: AsyncSession, uom_id: int) -> bool:
     stmt = select(Sku.id).where(Sku.uom_id == uom_id).limit(1)
     res = await session.execute(stmt)
@@ -35,8 +223,117 @@ async def create(session: AsyncSession, code: str, description: str, unit_price:
     obj = Sku(code=code, description=description, unit_price=unit_price, uom_id=uom_id)
     session.add(obj)
     await session.flush()
+    mark_changed(session, Sku.__tablename__)
     return obj
 
+async def bulk_create(session: AsyncSession, rows: list[dict], batch_size: int = 1000) -> int:
+    # One executemany / multi-row INSERT per batch instead of one flush per SKU.
+    for start in range(0, len(rows), batch_size):
+        await session.execute(insert(Sku), rows[start:start + batch_size])
+    if rows:
+        mark_changed(session, Sku.__tablename__)
+    return len(rows)
+
+async def insert_many_returning(session: AsyncSession, rows: list[dict]) -> dict[str, Row]:
+    """Multi-row INSERT ... ON CONFLICT DO NOTHING RETURNING; inserted rows keyed by code."""
+    if not rows:
+        return {}
+    stmt = insert_on_conflict_do_nothing(session, Sku).values(rows).returning(*Sku.__table__.c)
+    res = await session.execute(stmt)
+    inserted = {row.code: row for row in res}
+    if inserted:
+        mark_changed(session, Sku.__tablename__)
+    return inserted
+
+async def create_returning(
+    session: AsyncSession, code: str, description: str, unit_price: float, uom_id: int
+) -> Row | None:
+    # INSERT ... SELECT FROM unit_of_measurements ... ON CONFLICT DO NOTHING RETURNING:
+    # one round trip; no row comes back when the UOM is missing or a unique key conflicts.
+    source = select(
+        literal(code, Sku.code.type),
+        literal(description, Sku.description.type),
+        literal(unit_price, Sku.unit_price.type),
+        UnitOfMeasurement.id,
+    ).where(UnitOfMeasurement.id == uom_id)
+    stmt = (
+        insert_on_conflict_do_nothing(session, Sku)
+        .from_select(["code", "description", "unit_price", "uom_id"], source)
+        .returning(*Sku.__table__.c)
+    )
+    res = await session.execute(stmt)
+    row = res.one_or_none()
+    if row:
+        mark_changed(session, Sku.__tablename__)
+    return row
+
+async def update_returning(
+    session: AsyncSession, sku_id: int, changes: dict, expected_version: int | None = None
+) -> Row | None:
+    # UPDATE ... WHERE id = ? [AND version = ?] [AND EXISTS(uom)] RETURNING:
+    # no row when the SKU or the new UOM is missing, or the SKU has changed since `expected_version`.
+    where = [Sku.id == sku_id]
+    if expected_version is not None:
+        where.append(Sku.version == expected_version)
+    if not changes:
+        res = await session.execute(select(*Sku.__table__.c).where(*where))
+        return res.one_or_none()
+    stmt = sql_update(Sku).where(*where).values(**changes, version=Sku.version + 1)
+    if "uom_id" in changes:
+        stmt = stmt.where(exists().where(UnitOfMeasurement.id == changes["uom_id"]))
+    stmt = stmt.returning(*Sku.__table__.c).execution_options(synchronize_session=False)
+    res = await session.execute(stmt)
+    row = res.one_or_none()
+    if row:
+        mark_changed(session, Sku.__tablename__)
+    return row
+
+async def update_prices(
+    session: AsyncSession, prices: dict, key: str = "id", batch_size: int = 1000
+) -> set:
+    """Set unit_price per SKU id (or code) with UPDATE ... FROM (VALUES ...); returns the keys that matched."""
+    key_column = Sku.id if key == "id" else Sku.code
+    items = list(prices.items())
+    matched: set = set()
+    for start in range(0, len(items), batch_size):
+        changes = values(
+            column("key", key_column.type), column("unit_price", Sku.unit_price.type), name="price_changes"
+        ).data(items[start:start + batch_size]).cte("price_changes")
+        stmt = (
+            sql_update(Sku)
+            .values(unit_price=changes.c.unit_price, version=Sku.version + 1)
+            .where(key_column == changes.c.key)
+            .returning(key_column)
+            .execution_options(synchronize_session=False)
+        )
+        res = await session.execute(stmt)
+        matched.update(res.scalars().all())
+    if matched:
+        mark_changed(session, Sku.__tablename__)
+    return matched
+
+async def adjust_prices(session: AsyncSession, percent: Decimal, uom_id: int | None = None) -> int:
+    """Scale unit_price by `percent` in one UPDATE, rounded to the column's two decimals.
+
+    Raises ValueError, without updating anything, when the largest price would no longer fit Numeric(12, 2).
+    """
+    ratio = 1 + percent / 100
+    if ratio > 1:
+        largest = select(func.max(func.abs(Sku.unit_price)))
+        if uom_id is not None:
+            largest = largest.where(Sku.uom_id == uom_id)
+        top = (await session.execute(largest)).scalar()
+        if top is not None and round(Decimal(str(top)) * ratio, 2) > MAX_UNIT_PRICE:
+            raise ValueError(f"The adjustment would push unit_price past {MAX_UNIT_PRICE}")
+    factor = literal(ratio, Numeric())
+    stmt = sql_update(Sku).values(unit_price=func.round(Sku.unit_price * factor, 2), version=Sku.version + 1)
+    if uom_id is not None:
+        stmt = stmt.where(Sku.uom_id == uom_id)
+    res = await session.execute(stmt.execution_options(synchronize_session=False))
+    if res.rowcount:
+        mark_changed(session, Sku.__tablename__)
+    return res.rowcount
+
 async def update(
     session: AsyncSession,
     obj: Sku,
@@ -54,7 +351,9 @@ async def update(
     if uom_id is not None:
         obj.uom_id = uom_id
     await session.flush()
+    mark_changed(session, Sku.__tablename__)
     return obj
 
 async def delete(session: AsyncSession, obj: Sku) -> None:
     await session.delete(obj)
+    mark_changed(session, Sku.__tablename__)
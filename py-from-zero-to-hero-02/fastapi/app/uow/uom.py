@@ -1,15 +1,110 @@
-from sqlalchemy import select
-from sqlalchemy.ext.asyncio import AsyncSession
+import logging
+from collections.abc import AsyncIterator
 
+from sqlalchemy import Row, Select, event, func, select, update as sql_update
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine, AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.db.conflicts import insert_on_conflict_do_nothing
+from app.uow.versions import mark_changed
 from app.models.uom import UnitOfMeasurement
+from app.schemas.uom import UomOut
+
+logger = logging.getLogger(__name__)
+
+# UOMs almost never change and every SKU write looks one up, so keep snapshots in-process.
+cache: TTLCache[int, UomOut] = TTLCache(settings.UOM_CACHE_MAX_SIZE, settings.UOM_CACHE_TTL_SECONDS)
+
+CACHE_CHANNEL = "uom_cache_invalidate"
+_PENDING_CACHE_KEY = "uom_cache_pending"
+
+# Read path for list responses: project the UomOut columns only, never the SKU collection.
+_READ_COLUMNS = (UnitOfMeasurement.id, UnitOfMeasurement.code, UnitOfMeasurement.name, UnitOfMeasurement.version)
+
+def _read_stmt(after: int | None = None) -> Select:
+    stmt = select(*_READ_COLUMNS).order_by(UnitOfMeasurement.id)
+    if after is not None:
+        stmt = stmt.where(UnitOfMeasurement.id > after)
+    return stmt
 
-async def get_all(session: AsyncSession) -> list[UnitOfMeasurement]:
-    res = await session.execute(select(UnitOfMeasurement).order_by(UnitOfMeasurement.id))
-    return list(res.scalars().all())
+def _to_out(row: Row) -> UomOut:
+    return UomOut(id=row.id, code=row.code, name=row.name, version=row.version)
+
+async def get_all(session: AsyncSession) -> list[UomOut]:
+    res = await session.execute(_read_stmt())
+    return [_to_out(row) for row in res]
+
+async def get_page(session: AsyncSession, limit: int, after: int | None = None) -> list[UomOut]:
+    # Keyset pagination: seek past the last seen id instead of using OFFSET.
+    res = await session.execute(_read_stmt(after).limit(limit))
+    return [_to_out(row) for row in res]
+
+async def get_out_by_id(session: AsyncSession, uom_id: int) -> UomOut | None:
+    res = await session.execute(_read_stmt().where(UnitOfMeasurement.id == uom_id))
+    row = res.one_or_none()
+    return _to_out(row) if row else None
+
+async def stream_all(
+    session: AsyncSession, after: int | None = None, batch_size: int = 500
+) -> AsyncIterator[UomOut]:
+    # yield_per fetches rows in batches from a server-side cursor, so memory stays flat.
+    res = await session.stream(_read_stmt(after).execution_options(yield_per=batch_size))
+    async for row in res:
+        yield _to_out(row)
 
 async def get_by_id(session: AsyncSession, uom_id: int) -> UnitOfMeasurement | None:
     return await session.get(UnitOfMeasurement, uom_id)
 
+async def get_cached(session: AsyncSession, uom_id: int) -> UomOut | None:
+    """Read-only UOM lookup served from the in-process cache when possible."""
+
+    return await cache.get_or_load(uom_id, lambda: get_out_by_id(session, uom_id))
+
+async def _queue_cache_update(session: AsyncSession, uom_id: int, snapshot: UomOut | None) -> None:
+    # Applied to the cache only once the transaction commits (see _apply_cache_updates);
+    # None means the UOM was deleted. Every UOM write goes through here, so bump its version too.
+    mark_changed(session, UnitOfMeasurement.__tablename__)
+    session.info.setdefault(_PENDING_CACHE_KEY, {})[uom_id] = snapshot
+    if settings.UOM_CACHE_BROADCAST and session.bind.dialect.name == "postgresql":
+        # NOTIFY is transactional: other workers hear about it only if this transaction commits.
+        await session.execute(select(func.pg_notify(CACHE_CHANNEL, str(uom_id))))
+
+@event.listens_for(Session, "after_commit")
+def _apply_cache_updates(session: Session) -> None:
+    for uom_id, snapshot in session.info.pop(_PENDING_CACHE_KEY, {}).items():
+        if snapshot is None:
+            cache.invalidate(uom_id)
+        else:
+            cache.set(uom_id, snapshot)
+
+@event.listens_for(Session, "after_rollback")
+def _discard_cache_updates(session: Session) -> None:
+    session.info.pop(_PENDING_CACHE_KEY, None)
+
+async def listen_for_cache_invalidations(engine: AsyncEngine) -> AsyncConnection | None:
+    """Evict UOMs changed by other workers (Postgres LISTEN); returns the connection to close on shutdown."""
+    if not settings.UOM_CACHE_BROADCAST or engine.dialect.name != "postgresql":
+        return None
+
+    def on_notify(_connection, _pid, _channel, payload: str) -> None:
+        cache.invalidate(int(payload))
+
+    conn = await engine.connect()
+    raw = await conn.get_raw_connection()
+    await raw.driver_connection.add_listener(CACHE_CHANNEL, on_notify)
+    logger.info("Listening for UOM cache invalidations on %s", CACHE_CHANNEL)
+    return conn
+
+async def get_existing_ids(session: AsyncSession, uom_ids: list[int], chunk_size: int = 1000) -> set[int]:
+    found: set[int] = set()
+    for start in range(0, len(uom_ids), chunk_size):
+        chunk = uom_ids[start:start + chunk_size]
+        res = await session.execute(select(UnitOfMeasurement.id).where(UnitOfMeasurement.id.in_(chunk)))
+        found.update(res.scalars().all())
+    return found
+
 async def get_by_code(
     session: AsyncSession, code: str, exclude_id: int | None = None
 ) -> UnitOfMeasurement | None:
@@ -32,15 +127,55 @@ async def create(session: AsyncSession, name: str, code: str) -> UnitOfMeasureme
     obj = UnitOfMeasurement(name=name, code=code)
     session.add(obj)
     await session.flush()
+    await _queue_cache_update(session, obj.id, UomOut.model_validate(obj))
     return obj
 
+async def create_returning(session: AsyncSession, name: str, code: str) -> Row | None:
+    # INSERT ... ON CONFLICT DO NOTHING RETURNING: one round trip, no row on a code/name conflict.
+    stmt = (
+        insert_on_conflict_do_nothing(session, UnitOfMeasurement)
+        .values(name=name, code=code)
+        .returning(*UnitOfMeasurement.__table__.c)
+    )
+    res = await session.execute(stmt)
+    row = res.one_or_none()
+    if row:
+        await _queue_cache_update(session, row.id, _to_out(row))
+    return row
+
+async def update_returning(
+    session: AsyncSession, uom_id: int, changes: dict, expected_version: int | None = None
+) -> Row | None:
+    # UPDATE ... WHERE id = ? [AND version = ?] RETURNING: no row when the UOM is missing or has changed.
+    where = [UnitOfMeasurement.id == uom_id]
+    if expected_version is not None:
+        where.append(UnitOfMeasurement.version == expected_version)
+    if not changes:
+        res = await session.execute(select(*UnitOfMeasurement.__table__.c).where(*where))
+        return res.one_or_none()
+    stmt = (
+        sql_update(UnitOfMeasurement)
+        .where(*where)
+        .values(**changes, version=UnitOfMeasurement.version + 1)
+        .returning(*UnitOfMeasurement.__table__.c)
+        .execution_options(synchronize_session=False)
+    )
+    res = await session.execute(stmt)
+    row = res.one_or_none()
+    if row:
+        await _queue_cache_update(session, row.id, _to_out(row))
+    return row
+
 async def update(session: AsyncSession, obj: UnitOfMeasurement, name: str | None, code: str | None) -> UnitOfMeasurement:
     if name is not None:
         obj.name = name
     if code is not None:
         obj.code = code
     await session.flush()
+    await _queue_cache_update(session, obj.id, UomOut.model_validate(obj))
     return obj
 
 async def delete(session: AsyncSession, obj: UnitOfMeasurement) -> None:
     await session.delete(obj)
+    await _queue_cache_update(session, obj.id, None)
+
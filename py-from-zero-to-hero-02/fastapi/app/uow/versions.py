@@ -0,0 +1,46 @@
+from sqlalchemy import event, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.db.conflicts import insert_on_conflict_do_nothing
+from app.models.table_version import TableVersion
+
+_CHANGED_TABLES_KEY = "changed_tables"
+
+def mark_changed(session: AsyncSession, *tables: str) -> None:
+    """Record that the current transaction writes `tables`; their versions are bumped at commit."""
+    session.info.setdefault(_CHANGED_TABLES_KEY, set()).update(tables)
+
+async def get_versions(session: AsyncSession, tables: tuple[str, ...]) -> dict[str, int]:
+    res = await session.execute(
+        select(TableVersion.table_name, TableVersion.version).where(TableVersion.table_name.in_(tables))
+    )
+    versions = dict.fromkeys(tables, 0)
+    versions.update({row.table_name: row.version for row in res})
+    return versions
+
+@event.listens_for(Session, "before_commit")
+def _bump_versions(session: Session) -> None:
+    # before_commit runs before the final flush: flush pending ORM writes (e.g. session.delete) first, so the
+    # counter UPDATEs really are the last statements and the counter row is locked only until COMMIT.
+    session.flush()
+    # One UPDATE per changed table, in name order.
+    for table in sorted(session.info.pop(_CHANGED_TABLES_KEY, ())):
+        bump = (
+            update(TableVersion)
+            .where(TableVersion.table_name == table)
+            .values(version=TableVersion.version + 1)
+            .execution_options(synchronize_session=False)
+        )
+        if session.execute(bump).rowcount:
+            continue
+        # First write to this table: create its counter (another worker may win that race).
+        created = session.execute(
+            insert_on_conflict_do_nothing(session, TableVersion).values(table_name=table, version=1)
+        )
+        if not created.rowcount:
+            session.execute(bump)
+
+@event.listens_for(Session, "after_rollback")
+def _discard_changed_tables(session: Session) -> None:
+    session.info.pop(_CHANGED_TABLES_KEY, None)
@@ -9,6 +9,9 @@ from database import db, User
 # Import user routes
 from user_routes import user_bp
 
+# Schema version check
+from schema import check_schema
+
 app = Flask(__name__)
 
 # Load configurations from config.py
@@ -20,9 +23,9 @@ db.init_app(app)
 # Register Blueprints
 app.register_blueprint(user_bp)
 
-# Initialize Database
+# Tables are created by `python schema.py`; workers only check the schema version
 with app.app_context():
-    db.create_all()
+    check_schema()
 
 # Run the Flask App
 if __name__ == '__main__':
@@ -30,5 +33,5 @@ if __name__ == '__main__':
         app.run(debug=True, port=config_class.PORT)
     else:
         print(f"Running without debug mode PORT: {config_class.PORT}")
-        from waitress import serve
-        serve(app, host="0.0.0.0", port=config_class.PORT)
+        from server import serve
+        serve(app)
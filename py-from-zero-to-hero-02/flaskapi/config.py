@@ -10,6 +10,32 @@ class Config:
     SQLALCHEMY_DATABASE_URI = os.environ.get("APP_DB_URL", "sqlite:///dev_users.db")
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     PORT = os.environ.get("APP_PORT", 8000)
+    # PRAGMAs run on every new SQLite connection (see database.py), APP_SQLITE_TUNING=false keeps SQLite's defaults:
+    # WAL (readers and the writer don't block each other), fsync at checkpoints only, 256 MB mmap,
+    # 64 MB page cache per connection and up to 5 s waiting for a lock instead of "database is locked"
+    SQLITE_PRAGMAS = {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "mmap_size": 268435456,
+        "cache_size": -64000,
+        "busy_timeout": 5000,
+    } if os.environ.get("APP_SQLITE_TUNING", "true").lower() == "true" else {}
+    # Production server (python server.py): worker processes x threads per worker
+    SERVER_WORKERS = int(os.environ.get("APP_WORKERS", 1))
+    SERVER_THREADS = int(os.environ.get("APP_THREADS", 4))
+    # Load the app once before forking the workers (copy-on-write) instead of once per worker
+    SERVER_PRELOAD = os.environ.get("APP_PRELOAD", "true").lower() == "true"
+    # Each worker process has its own pool: one connection per thread, plus a few for bursts
+    SQLALCHEMY_ENGINE_OPTIONS = {
+        "pool_size": SERVER_THREADS,
+        "max_overflow": int(os.environ.get("APP_DB_POOL_OVERFLOW", 2)),
+        "pool_pre_ping": True,
+    }
+    # GET /users page size (?limit=) and its upper bound
+    USERS_PAGE_LIMIT = int(os.environ.get("APP_USERS_PAGE_LIMIT", 100))
+    USERS_PAGE_LIMIT_MAX = int(os.environ.get("APP_USERS_PAGE_LIMIT_MAX", 1000))
+    # Max users accepted by one POST /users/batch
+    USERS_BATCH_MAX = int(os.environ.get("APP_USERS_BATCH_MAX", 1000))
 
 class DevelopmentConfig(Config):
     # The server automatically restarts when you modify Python files
@@ -1,9 +1,31 @@
+import sqlite3
+
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from config import config_class
 
 # Initialize SQLAlchemy (without Flask app)
 db = SQLAlchemy()
 
+@event.listens_for(Engine, "connect")
+def apply_sqlite_pragmas(dbapi_connection, connection_record):
+    """Applies Config.SQLITE_PRAGMAS to every new SQLite connection (other databases are left alone)."""
+    if not isinstance(dbapi_connection, sqlite3.Connection):
+        return
+    cursor = dbapi_connection.cursor()
+    for name, value in config_class.SQLITE_PRAGMAS.items():
+        cursor.execute(f"PRAGMA {name}={value}")
+    cursor.close()
+
 class User(db.Model):
     """User model for storing user details."""
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), nullable=False)
+
+class TableVersion(db.Model):
+    """Write counter of a table: every change bumps it, so it doubles as the ETag of its listings."""
+    __tablename__ = "table_versions"
+    table_name = db.Column(db.String(64), primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
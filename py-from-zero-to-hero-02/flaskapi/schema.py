@@ -0,0 +1,44 @@
+from sqlalchemy import Column, Integer, Table, delete, insert, select
+from sqlalchemy.exc import DBAPIError
+
+from database import db
+from versions import seed_versions
+
+# Bump whenever the models change; `python schema.py` creates the new tables and stamps it.
+SCHEMA_VERSION = 2
+
+schema_version = Table("schema_version", db.metadata, Column("version", Integer, primary_key=True))
+
+def current_schema_version():
+    """Applied schema version, or None when the database was never initialized."""
+    try:
+        return db.session.execute(select(schema_version.c.version)).scalar_one_or_none()
+    except DBAPIError:
+        db.session.rollback()
+        return None
+
+def check_schema():
+    """One SELECT at startup instead of db.create_all() in every worker."""
+    version = current_schema_version()
+    if version != SCHEMA_VERSION:
+        raise RuntimeError(f"Database schema version is {version}, expected {SCHEMA_VERSION}: run `python schema.py`")
+
+def upgrade_schema():
+    """Create missing tables and stamp the current version."""
+    db.create_all()
+    seed_versions()
+    db.session.execute(delete(schema_version))
+    db.session.execute(insert(schema_version).values(version=SCHEMA_VERSION))
+    db.session.commit()
+
+# Create or upgrade the schema (explicit deploy step, does not import app.py)
+if __name__ == '__main__':
+    from flask import Flask
+    from config import config_class
+
+    app = Flask(__name__)
+    app.config.from_object(config_class)
+    db.init_app(app)
+    with app.app_context():
+        upgrade_schema()
+    print(f"Database schema at version {SCHEMA_VERSION}")
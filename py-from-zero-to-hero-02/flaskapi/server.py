@@ -0,0 +1,61 @@
+import importlib
+import os
+
+from config import config_class
+from database import db
+
+# Module and variable of the Flask app, for `python server.py`
+APP_PATH = "app:app"
+
+def load_app(path):
+    """Imports "module:variable" and returns the variable"""
+    module_name, _, name = path.partition(":")
+    return getattr(importlib.import_module(module_name), name)
+
+def release_connections(app):
+    """Closes the pooled connections, so forked workers never share a socket or file handle"""
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose()
+
+def serve(app):
+    """Serves the app with SERVER_WORKERS processes x SERVER_THREADS threads (see Config).
+
+    `app` is the Flask app or its import path: with a path and SERVER_PRELOAD off, each worker imports the app
+    itself; otherwise it is loaded once, before forking, and the workers share its memory copy-on-write.
+    Multiple workers need gunicorn (Linux/macOS); elsewhere it falls back to a single waitress process.
+    """
+    workers = config_class.SERVER_WORKERS
+    threads = config_class.SERVER_THREADS
+    multi_process = workers > 1 and os.name == "posix"
+    if isinstance(app, str) and (config_class.SERVER_PRELOAD or not multi_process):
+        app = load_app(app)
+
+    if not multi_process:
+        print(f"Running waitress PORT: {config_class.PORT} threads: {threads}")
+        from waitress import serve as waitress_serve
+        waitress_serve(app, host="0.0.0.0", port=config_class.PORT, threads=threads)
+        return
+
+    from gunicorn.app.base import BaseApplication
+
+    class GunicornServer(BaseApplication):
+        def load_config(self):
+            self.cfg.set("bind", f"0.0.0.0:{config_class.PORT}")
+            self.cfg.set("workers", workers)
+            self.cfg.set("threads", threads)
+            self.cfg.set("worker_class", "gthread")
+            self.cfg.set("preload_app", not isinstance(app, str))
+
+        def load(self):
+            # Preloaded: runs once in the parent process, right before forking the workers
+            wsgi_app = load_app(app) if isinstance(app, str) else app
+            release_connections(wsgi_app)
+            return wsgi_app
+
+    print(f"Running gunicorn PORT: {config_class.PORT} workers: {workers} threads: {threads}")
+    GunicornServer().run()
+
+# Production entry point: python server.py
+if __name__ == '__main__':
+    serve(APP_PATH)
@@ -1,5 +1,7 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, current_app, request, jsonify
+from sqlalchemy import insert, select
 from database import db, User
+from versions import bump_version, get_version
 
 # Create a Blueprint for user routes
 user_bp = Blueprint("user_bp", __name__)
@@ -10,14 +12,62 @@ def create_user():
     data = request.json
     new_user = User(name=data['name'])
     db.session.add(new_user)
+    bump_version(User.__tablename__)
     db.session.commit()
     return jsonify({"message": "User created!"}), 201
 
-# Read (GET) - Get all users
+# Create many (POST) - one INSERT and one commit for the whole list
+@user_bp.route('/users/batch', methods=['POST'])
+def create_users():
+    data = request.json
+    max_size = current_app.config["USERS_BATCH_MAX"]
+    if not isinstance(data, list) or not 0 < len(data) <= max_size:
+        return jsonify({"message": f"Expected a list of 1 to {max_size} users"}), 400
+    rows = []
+    for index, item in enumerate(data):
+        name = item.get('name') if isinstance(item, dict) else None
+        if not isinstance(name, str) or not name.strip() or len(name) > 100:
+            return jsonify({"message": f"Invalid name at position {index}"}), 400
+        rows.append({"name": name})
+    # executemany with RETURNING: ids come back in the same round trips, in input order
+    ids = db.session.scalars(insert(User).returning(User.id, sort_by_parameter_order=True), rows).all()
+    bump_version(User.__tablename__)
+    db.session.commit()
+    return jsonify({"message": f"{len(ids)} users created!", "ids": ids}), 201
+
+# Read (GET) - Get all users, or one page at a time: /users?limit=100&after_id=<last id of the previous page>
 @user_bp.route('/users', methods=['GET'])
 def get_users():
-    users = User.query.all()
-    return jsonify([{"id": user.id, "name": user.name} for user in users])
+    config = current_app.config
+    # Without limit/after_id the response stays the full list, as before paging existed
+    paged = 'limit' in request.args or 'after_id' in request.args
+    try:
+        # int() rather than args.get(type=int), which would silently fall back to the default on "?limit=abc"
+        limit = int(request.args.get('limit', config["USERS_PAGE_LIMIT"]))
+        after_id = int(request.args.get('after_id', 0))
+    except ValueError:
+        return jsonify({"message": "limit and after_id must be integers"}), 400
+    if paged and not 0 < limit <= config["USERS_PAGE_LIMIT_MAX"]:
+        return jsonify({"message": f"limit must be between 1 and {config['USERS_PAGE_LIMIT_MAX']}"}), 400
+
+    # The table version changes on every write, so an unchanged ETag means an unchanged page
+    page = f"{after_id}-{limit}" if paged else "all"
+    etag = f"users-v{get_version(User.__tablename__)}-{page}"
+    if request.if_none_match.contains(etag):
+        response = current_app.response_class(status=304)
+        response.set_etag(etag)
+        return response
+
+    stmt = select(User.id, User.name).order_by(User.id)
+    if paged:
+        # Keyset pagination: the primary key index jumps straight to the page, no OFFSET scan
+        stmt = stmt.where(User.id > after_id).limit(limit)
+    rows = db.session.execute(stmt).all()
+    response = jsonify([{"id": row.id, "name": row.name} for row in rows])
+    response.set_etag(etag)
+    if paged and len(rows) == limit:
+        response.headers["X-Next-After-Id"] = str(rows[-1].id)
+    return response
 
 # Read by ID (GET)
 @user_bp.route('/users/<int:id>', methods=['GET'])
@@ -34,6 +84,7 @@ def update_user(id):
     if user:
         data = request.json
         user.name = data['name']
+        bump_version(User.__tablename__)
         db.session.commit()
         return jsonify({"message": "User updated!"})
     return jsonify({"message": "User not found"}), 404
@@ -44,6 +95,7 @@ def delete_user(id):
     user = User.query.get(id)
     if user:
         db.session.delete(user)
+        bump_version(User.__tablename__)
         db.session.commit()
         return jsonify({"message": "User deleted!"})
     return jsonify({"message": "User not found"}), 404
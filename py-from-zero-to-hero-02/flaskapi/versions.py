@@ -0,0 +1,26 @@
+from sqlalchemy import select, update
+
+from database import db, TableVersion, User
+
+# Tables whose counter is created by `python schema.py`
+VERSIONED_TABLES = (User.__tablename__,)
+
+def get_version(table_name):
+    """Current write counter of a table (one primary key lookup)."""
+    version = db.session.execute(
+        select(TableVersion.version).where(TableVersion.table_name == table_name)
+    ).scalar_one_or_none()
+    return version or 0
+
+def bump_version(table_name):
+    """Increment the counter inside the current transaction, so it commits (or rolls back) with the change."""
+    db.session.execute(
+        update(TableVersion)
+        .where(TableVersion.table_name == table_name)
+        .values(version=TableVersion.version + 1)
+    )
+
+def seed_versions():
+    """Create the missing counters (called by upgrade_schema)."""
+    existing = set(db.session.scalars(select(TableVersion.table_name)))
+    db.session.add_all(TableVersion(table_name=name, version=0) for name in VERSIONED_TABLES if name not in existing)
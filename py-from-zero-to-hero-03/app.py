@@ -10,6 +10,7 @@ from langchain.memory import ConversationBufferMemory
 # DB Settings
 from database import db
 from model import Order
+from schema import check_schema
 
 # Util
 from util import load_documents, bad_request, parse_order, not_found_request, ok_request, is_valid_scope
@@ -26,9 +27,9 @@ app.config.from_object(config_class)
 # Bind SQLAlchemy to Flask app
 db.init_app(app)
 
-# Initialize Database
+# Tables are created by `python schema.py`; workers only check the schema version
 with app.app_context():
-     db.create_all()
+     check_schema()
 
 # Context Memory using Python Dictionary
 client_memories = {}  # chat
@@ -49,6 +50,13 @@ chat = ChatOpenAI(model=config_class.AI_MODEL_NAME, temperature=0)
 # Create retriever using vectorstore
 retriever = vectorstore.as_retriever()
 
+def reset_clients():
+    """New OpenAI clients for a forked worker (see server.py): the ones used to build the vectorstore
+    keep the parent's HTTP keep-alive connections, which the workers would otherwise share"""
+    global chat
+    vectorstore.embedding_function = OpenAIEmbeddings()
+    chat = ChatOpenAI(model=config_class.AI_MODEL_NAME, temperature=0)
+
 @app.route('/info', methods=['POST'])
 def ask():
     data = request.get_json()
@@ -106,5 +114,5 @@ if __name__ == '__main__':
      app.run(debug=True, port=config_class.PORT)
    else:
      print(f"Running without debug mode PORT: {config_class.PORT}")
-     from waitress import serve
-     serve(app, host="0.0.0.0", port=config_class.PORT)
\ No newline at end of file
+     from server import serve
+     serve(app, reset_clients)
\ No newline at end of file
@@ -4,14 +4,16 @@ import logging
 from flask import Flask, request
 
 # LangChain
+from langchain_ollama import OllamaEmbeddings
 from ollama import chat
 
 # DB Settings
 from database import db
 from model import Order
+from schema import check_schema
 
 # Util
-from util import create_retriever, create_vector_db, internal_server_error_request, load_documents, bad_request, parse_order, not_found_request, ok_request, is_valid_scope, rag_query, split_documents
+from util import create_retriever, create_vector_db, internal_server_error_request, load_documents, bad_request, parse_order, not_found_request, ok_request, is_valid_scope, rag_query, reset_ollama_client, split_documents
 
 # Import the config class
 from config import config_class
@@ -28,9 +30,9 @@ app.config.from_object(config_class)
 # Bind SQLAlchemy to Flask app
 db.init_app(app)
 
-# Initialize Database
+# Tables are created by `python schema.py`; workers only check the schema version
 with app.app_context():
-   db.create_all()
+   check_schema()
 
 # Context Memory using Python Dictionary
 client_memories = {}  # chat
@@ -55,6 +57,13 @@ retriever = create_retriever(vector_db, llm)
 
 logging.info("Done!")
 
+def reset_clients():
+    """New Ollama clients for a forked worker (see server.py): the ones used while loading keep the
+    parent's HTTP keep-alive connections, which the workers would otherwise share"""
+    reset_ollama_client()
+    # The vector DB embeds each question with the embeddings client it was built with
+    vector_db._embedding_function = OllamaEmbeddings(model=config_class.AI_EMBEDDING_MODEL)
+
 @app.route('/info', methods=['POST'])
 def ask():
    data = request.get_json()
@@ -109,5 +118,5 @@ if __name__ == '__main__':
      app.run(debug=True, port=config_class.PORT)
    else:
      print(f"Running without debug mode PORT: {config_class.PORT}")
-     from waitress import serve
-     serve(app, host="0.0.0.0", port=config_class.PORT)
\ No newline at end of file
+     from server import serve
+     serve(app, reset_clients)
\ No newline at end of file
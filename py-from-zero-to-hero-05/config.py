@@ -14,6 +14,25 @@ class Config:
     SECRET_KEY = os.environ.get("APP_SECRET_KEY", "")
     SQLALCHEMY_DATABASE_URI = os.environ.get("APP_DB_URL", "sqlite:///orders.db")
     PORT = os.environ.get("APP_PORT", 5001)
+    # PRAGMAs run on every new SQLite connection (see database.py), APP_SQLITE_TUNING=false keeps SQLite's defaults:
+    # WAL (readers and the writer don't block each other), fsync at checkpoints only, 256 MB mmap,
+    # 64 MB page cache per connection and up to 5 s waiting for a lock instead of "database is locked"
+    SQLITE_PRAGMAS = {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "mmap_size": 268435456,
+        "cache_size": -64000,
+        "busy_timeout": 5000,
+    } if os.environ.get("APP_SQLITE_TUNING", "true").lower() == "true" else {}
+    # Production server (python server.py): worker processes x threads per worker
+    SERVER_WORKERS = int(os.environ.get("APP_WORKERS", 1))
+    SERVER_THREADS = int(os.environ.get("APP_THREADS", 4))
+    # Each worker process has its own pool: one connection per thread, plus a few for bursts
+    SQLALCHEMY_ENGINE_OPTIONS = {
+        "pool_size": SERVER_THREADS,
+        "max_overflow": int(os.environ.get("APP_DB_POOL_OVERFLOW", 2)),
+        "pool_pre_ping": True,
+    }
     AI_MODEL_NAME = "mistral:7b"
     AI_EMBEDDING_MODEL = "nomic-embed-text"
     DB_COLLECTION_NAME = "db-vector"
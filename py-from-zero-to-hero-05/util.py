@@ -12,13 +12,21 @@ from langchain_core.output_parsers import StrOutputParser
 
 # ollama
 from langchain_ollama import OllamaEmbeddings
-from ollama import chat
+from ollama import Client
 
 # Rest API
 from flask import jsonify
 
 from model_info import OrderInfo, ScopeInfo
 
+# Ollama client of this process, replaced by reset_ollama_client() in forked workers
+ollama_client = Client()
+
+def reset_ollama_client():
+    """A forked worker must not reuse the parent's HTTP keep-alive connections"""
+    global ollama_client
+    ollama_client = Client()
+
 
 def load_documents(folder_path, extension):
     """ from a document folder, returns a list of documents considering the extension file """
@@ -82,7 +90,7 @@ def rag_query(model, retriever, user_query):
     )
     
     # Step 4: Call Ollama chat
-    response = chat(
+    response = ollama_client.chat(
         model=model,
         messages=[
             {"role": "system", "content": "You are a helpful assistant."},
@@ -109,7 +117,7 @@ def parse_order(question, model):
     ]
 
     # Run the chat
-    response = chat(
+    response = ollama_client.chat(
         model=model, 
         messages=messages, 
         stream=False,
@@ -143,7 +151,7 @@ def is_valid_scope(question, model):
     ]
 
     # Run the chat
-    response = chat(
+    response = ollama_client.chat(
         model=model, 
         messages=messages, 
         stream=False,
@@ -9,9 +9,10 @@ from flask import Flask
 
 # DB Settings
 from src.database import db
+from src.database.schema import check_schema
 
 # Import the config class
-from config import config_class
+from src.config import config_class
 
 # Import user routes
 from src.resources import info_bp
@@ -29,11 +30,9 @@ def create_app():
     db.init_app(app)
     # Register Blueprints
     app.register_blueprint(info_bp)
-    # for the first request, inits DB
-    @app.before_request
-    def create_db_tables():
-        logging.info("app:create_db_tables")
-        db.create_all()
+    # Tables are created by `python -m src.database.schema`; here we only check the schema version once
+    with app.app_context():
+        check_schema()
 
     return app
 
@@ -46,5 +45,6 @@ if __name__ == '__main__':
      app.run(debug=True, port=config_class.PORT)
    else:
      print(f"Running without debug mode PORT: {config_class.PORT}")
-     from waitress import serve
-     serve(app, host="0.0.0.0", port=config_class.PORT)
\ No newline at end of file
+     from src.server import serve
+     from src.resources.info_bp import reset_clients
+     serve(app, reset_clients)
\ No newline at end of file
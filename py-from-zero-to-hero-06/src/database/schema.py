@@ -0,0 +1,42 @@
+from sqlalchemy import Column, Integer, Table, delete, insert, select
+from sqlalchemy.exc import DBAPIError
+
+from src.database import db
+from src.model.order_model import OrderModel  # registers the orders table
+
+# Bump whenever the models change; `python -m src.database.schema` creates the new tables and stamps it.
+SCHEMA_VERSION = 1
+
+schema_version = Table("schema_version", db.metadata, Column("version", Integer, primary_key=True))
+
+def check_schema():
+    """One SELECT at startup instead of db.create_all() in every worker."""
+    try:
+        version = db.session.execute(select(schema_version.c.version)).scalar_one_or_none()
+    except DBAPIError:
+        # No schema_version table: the database was never initialized
+        db.session.rollback()
+        version = None
+    if version != SCHEMA_VERSION:
+        raise RuntimeError(
+            f"Database schema version is {version}, expected {SCHEMA_VERSION}: run `python -m src.database.schema`"
+        )
+
+def upgrade_schema():
+    """Create missing tables and stamp the current version."""
+    db.create_all()
+    db.session.execute(delete(schema_version))
+    db.session.execute(insert(schema_version).values(version=SCHEMA_VERSION))
+    db.session.commit()
+
+# Create or upgrade the schema (explicit deploy step, does not import src/app.py)
+if __name__ == '__main__':
+    from flask import Flask
+    from src.config import config_class
+
+    app = Flask(__name__)
+    app.config.from_object(config_class)
+    db.init_app(app)
+    with app.app_context():
+        upgrade_schema()
+    print(f"Database schema at version {SCHEMA_VERSION}")
@@ -7,11 +7,14 @@ from src.lib.prompt import get_ollama_client, is_valid_scope, parse_order, rag_q
 from src.lib.util import bad_request, create_retriever, create_vector_db, internal_server_error_request, load_documents, not_found_request, ok_request, sanitize_input, split_documents
 
 # Import the config class
-from config import config_class
+from src.config import config_class
 
 # Redis
 import redis
 
+# Embeddings used by the vector DB
+from langchain_ollama import OllamaEmbeddings
+
 # DB Models
 from src.model.order_model import OrderModel
 
@@ -47,6 +50,11 @@ retriever = create_retriever(vector_db)
 
 logging.info("Done!")
 
+def reset_clients():
+    """New embeddings client for a forked worker (see src/server.py): the one used to build the vector DB keeps
+    the parent's HTTP keep-alive connections. redis-py already resets its pool in a new process."""
+    vector_db._embedding_function = OllamaEmbeddings(base_url=config_class.OLLAMA_HOST, model=config_class.AI_EMBEDDING_MODEL)
+
 @info_bp.route('/info', methods=['POST'])
 def ask():
    data = request.get_json()
@@ -0,0 +1,53 @@
+import os
+
+from src.config import config_class
+from src.database import db
+
+def release_connections(app):
+    """Closes the pooled connections, so forked workers never share a socket or file handle"""
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose()
+
+def serve(app, after_fork=None):
+    """Serves the Flask app with SERVER_WORKERS processes x SERVER_THREADS threads (see Config).
+
+    The app is already loaded here, so gunicorn forks the workers from this process and they share
+    its documents and vector store copy-on-write. after_fork() runs first thing in each worker, to replace
+    the LLM/embedding clients whose keep-alive sockets were opened while loading (two workers must never
+    share one connection). Multiple workers need gunicorn (Linux/macOS); elsewhere it falls back to a
+    single waitress process.
+    """
+    workers = config_class.SERVER_WORKERS
+    threads = config_class.SERVER_THREADS
+    if workers <= 1 or os.name != "posix":
+        print(f"Running waitress PORT: {config_class.PORT} threads: {threads}")
+        from waitress import serve as waitress_serve
+        waitress_serve(app, host="0.0.0.0", port=config_class.PORT, threads=threads)
+        return
+
+    from gunicorn.app.base import BaseApplication
+
+    class GunicornServer(BaseApplication):
+        def load_config(self):
+            self.cfg.set("bind", f"0.0.0.0:{config_class.PORT}")
+            self.cfg.set("workers", workers)
+            self.cfg.set("threads", threads)
+            self.cfg.set("worker_class", "gthread")
+            self.cfg.set("preload_app", True)
+            if after_fork is not None:
+                self.cfg.set("post_fork", lambda server, worker: after_fork())
+
+        def load(self):
+            # Runs once in the parent process, right before forking the workers
+            release_connections(app)
+            return app
+
+    print(f"Running gunicorn PORT: {config_class.PORT} workers: {workers} threads: {threads}")
+    GunicornServer().run()
+
+# Production entry point: python -m src.server
+if __name__ == '__main__':
+    from src.app import app
+    from src.resources.info_bp import reset_clients
+    serve(app, reset_clients)